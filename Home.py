@@ -2,8 +2,17 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
+import sys
 from datetime import datetime
 
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from data_loader import DATA_PATH, load_bkk_data, compute_kpis, get_preview_table
+
+# Remote logo URLs are handed straight to the browser by st.image (no
+# server-side download), so the browser's HTTP cache already covers reruns
+LOGO_URL = "https://pbs.twimg.com/profile_images/807822247264014336/0wmn4ZjP_400x400.jpg"
+
 # Page setup
 st.set_page_config(page_title="ThaiDash", layout="wide")
 
@@ -29,7 +38,7 @@ st.markdown('<div class="centered-header">', unsafe_allow_html=True)
 # Image column
 col1, col2 = st.columns([1, 3])
 with col1:
-    st.image("https://pbs.twimg.com/profile_images/807822247264014336/0wmn4ZjP_400x400.jpg", width=200)
+    st.image(LOGO_URL, width=200)
 
 with col2:
     st.markdown('<div class="header-title">', unsafe_allow_html=True)
@@ -80,43 +89,39 @@ with st.expander("🎯 **Project Objectives**", expanded=False):
     """)
 
 # Check for data file
-data_path = "data/raw/bkk_data_final.csv"
+data_path = DATA_PATH
 
 if os.path.exists(data_path):
     st.success(f"✅ Data loaded successfully: {data_path}")
     
-    # Load data
-    with st.spinner("Loading data..."):
-        df = pd.read_csv(data_path)
+    # Load data (cached across reruns)
+    df = load_bkk_data(data_path)
+    kpis = compute_kpis(df)
     
     # Dashboard Statistics
     st.subheader("📊 Dashboard Statistics")
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_records = len(df)
-        st.metric("Total Registrations", f"{total_records:,}")
+        st.metric("Total Registrations", f"{kpis['total_registrations']:,}")
     
     with col2:
-        unique_participants = df['ID'].nunique() if 'ID' in df.columns else "N/A"
-        st.metric("Unique Participants", f"{unique_participants:,}")
+        st.metric("Unique Participants", f"{kpis['unique_participants']:,}")
     
     with col3:
-        total_revenue = df['ticketTypePrice'].sum() if 'ticketTypePrice' in df.columns else 0
-        st.metric("Total Revenue", f"฿{total_revenue:,.0f}")
+        st.metric("Total Revenue", f"฿{kpis['total_revenue']:,.0f}")
     
     with col4:
-        avg_price = df['ticketTypePrice'].mean() if 'ticketTypePrice' in df.columns else 0
-        st.metric("Average Ticket Price", f"฿{avg_price:,.0f}")
+        st.metric("Average Ticket Price", f"฿{kpis['avg_ticket_price']:,.0f}")
     
     # Show data preview
     with st.expander("🔍 **View Raw Data**", expanded=False):
-        st.dataframe(df.head(100))
+        st.dataframe(get_preview_table(df))
         st.caption(f"Showing first 100 of {len(df):,} records")
         
 else:
     st.error(f"❌ Data file not found at: {data_path}")
-    st.info("Please ensure your CSV file is at: data/raw/bkk_data_final.csv")
+    st.info(f"Please ensure your CSV file is at: {data_path}")
     
     # Create sample data for testing
     if st.button("Generate Sample Data for Testing"):
@@ -2,8 +2,48 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
+import sys
 from datetime import datetime
 
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from data_loader import DATA_PATH, load_bkk_data, compute_kpis, count_file_columns, get_preview_table
+
+# Cached chart builders - keyed on small tuples so hashing stays trivial
+@st.cache_data(show_spinner=False)
+def build_top_events_fig(events, counts):
+    """Horizontal bar chart of the most popular events"""
+    fig = px.bar(
+        x=counts,
+        y=events,
+        orientation='h',
+        title="Top 10 Events",
+        color=counts,  # Add color based on values
+        color_continuous_scale='plasma'  # Use rainbow color scale
+    )
+    
+    # Update layout to make it prettier
+    fig.update_layout(
+        coloraxis_colorbar=dict(
+            title="Count",
+            thickness=15,
+            len=0.6
+        ),
+        yaxis=dict(
+            autorange="reversed"  # Makes highest on top
+        )
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def build_gender_fig(genders, counts):
+    """Pie chart of gender over unique participants"""
+    return px.pie(
+        values=counts,
+        names=genders,
+        title="Gender Distribution (Unique Participants Only)"
+    )
+
 # Page setup
 #st.set_page_config(page_title="ThaiDash", layout="wide")
 
@@ -11,95 +51,75 @@ from datetime import datetime
 #st.markdown("### Your dashboard is loading...")
 
 # Check for data file
-data_path = "data/raw/bkk_data_final.csv"
+data_path = DATA_PATH
 
 if os.path.exists(data_path):
     #st.success(f"✅ Data found: {data_path}")
     
-    # Load data
-    with st.spinner("Loading data..."):
-        df = pd.read_csv(data_path)
+    # Load data (cached across reruns)
+    df = load_bkk_data(data_path)
+    kpis = compute_kpis(df)
         
     # Show basic info
     st.markdown('<h1 class="main-title">📊 Data Overview</h1>', unsafe_allow_html=True)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Records", len(df))
+        st.metric("Total Records", kpis['total_registrations'])
     
     with col2:
-        st.metric("Unique Participants", df['ID'].nunique())
+        st.metric("Unique Participants", kpis['unique_participants'])
     
     with col3:
-        st.metric("Columns", len(df.columns))
+        st.metric("Columns", count_file_columns(data_path))
     
     with col4:
-        st.metric("Size", f"{df.memory_usage().sum() / 1024:.0f} KB")
+        st.metric("Size", f"{kpis['memory_kb']:.0f} KB")
     
     # Show data preview
     with st.expander("🔍 View Data (First 100 rows)"):
-        st.dataframe(df.head(100))
+        st.dataframe(get_preview_table(df))
     
     # Quick analysis
     st.subheader("📈 Quick Insights")
     
-   # 1. Event popularity
-if 'eventName' in df.columns:
-    top_events = df['eventName'].value_counts().head(10)
-    fig1 = px.bar(
-        x=top_events.values,
-        y=top_events.index,
-        orientation='h',
-        title="Top 10 Events",
-        color=top_events.values,  # Add color based on values
-        color_continuous_scale='plasma'  # Use rainbow color scale
-    )
-    
-    # Update layout to make it prettier
-    fig1.update_layout(
-        coloraxis_colorbar=dict(
-            title="Count",
-            thickness=15,
-            len=0.6
-        ),
-        yaxis=dict(
-            autorange="reversed"  # Makes highest on top
+    # 1. Event popularity
+    if 'eventName' in df.columns:
+        top_events = kpis['top_events']
+        fig1 = build_top_events_fig(
+            tuple(top_events.index.astype(str)),
+            tuple(top_events.values.tolist())
         )
-    )
+        
+        st.plotly_chart(fig1, use_container_width=True)
     
-    st.plotly_chart(fig1, use_container_width=True)
     # 2. Price distribution
     if 'ticketTypePrice' in df.columns:
         col1, col2, col3 = st.columns(3)
         with col1:
-            avg_price = df['ticketTypePrice'].mean()
-            st.metric("Average Price", f"฿{avg_price:,.0f}")
+            st.metric("Average Price", f"฿{kpis['avg_ticket_price']:,.0f}")
         
         with col2:
-            total_revenue = df['ticketTypePrice'].sum()
-            st.metric("Total Revenue", f"฿{total_revenue:,.0f}")
+            st.metric("Total Revenue", f"฿{kpis['total_revenue']:,.0f}")
             
         with col3:
-            unique_participants = df['ID'].nunique()
-            st.metric("Unique Participants", unique_participants)
+            st.metric("Unique Participants", kpis['unique_participants'])
     
     # 3. Gender distribution - UNIQUE PARTICIPANTS ONLY
     if 'gender' in df.columns:
-        # Get unique participants (first occurrence of each ID)
-        unique_df = df.drop_duplicates(subset=['ID'], keep='first')
-        gender_counts = unique_df['gender'].value_counts()
+        # Counted once per data load over unique participants
+        gender_counts = kpis['gender_counts']
         
         # Gender pie chart only (no metrics)
-        fig2 = px.pie(
-            values=gender_counts.values,
-            names=gender_counts.index,
-            title="Gender Distribution (Unique Participants Only)"
+        fig2 = build_gender_fig(
+            tuple(gender_counts.index.astype(str)),
+            tuple(gender_counts.values.tolist())
         )
         st.plotly_chart(fig2, use_container_width=True)
         
 else:
     st.error(f"❌ Data file not found at: {data_path}")
-    st.info("Please ensure your CSV file is at: data/raw/bkk_data_final.csv")
+    st.info(f"Please ensure your CSV file is at: {data_path}")
     
     # Create sample data for testing
     if st.button("Generate Sample Data for Testing"):
@@ -117,10 +137,10 @@ else:
 # Sidebar
 with st.sidebar:
     st.write("**Data Information**")
-    if 'df' in locals():
-        st.write(f"Total Rows: {len(df)}")
-        st.write(f"Unique IDs: {df['ID'].nunique()}")
-        st.write(f"Duplicate Entries: {len(df) - df['ID'].nunique()}")
+    if 'kpis' in locals():
+        st.write(f"Total Rows: {kpis['total_registrations']}")
+        st.write(f"Unique IDs: {kpis['unique_participants']}")
+        st.write(f"Duplicate Entries: {kpis['total_registrations'] - kpis['unique_participants']}")
     st.markdown("---")
     st.write("**Version:** 1.0.0")
     st.write(f"**Last loaded:** {datetime.now().strftime('%H:%M')}")
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sys
@@ -9,8 +9,8 @@ import os
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from data_loader import load_data, save_processed_data
-from preprocessing import clean_event_data, calculate_kpis, get_top_categories
+from data_loader import get_clean_data, save_processed_data
+from preprocessing import WEEKDAY_DTYPE, calculate_kpis, get_top_categories
 
 # ========== PAGE CONFIGURATION ==========
 st.set_page_config(
@@ -62,53 +62,238 @@ with st.sidebar:
     All data is from real event registrations.
     """)
 
+# ========== CHART ORDERING ==========
+DISTANCE_ORDER = ['5K', '10K', '21.1K', '42.2K', 'Other']
+AGE_ORDER = ['<18', '18-24', '25-34', '35-44', '45-54', '55+']
+
+# ========== CHART STYLE ==========
+# Shared by every figure; go.Figure copies it so it can be reused as-is
+BASE_LAYOUT = dict(margin=dict(l=40, r=20, t=20, b=40))
+
+# Plotly's Set3, Pastel and Viridis palettes, inlined
+SET3_COLORS = [
+    'rgb(141,211,199)', 'rgb(255,255,179)', 'rgb(190,186,218)', 'rgb(251,128,114)',
+    'rgb(128,177,211)', 'rgb(253,180,98)', 'rgb(179,222,105)', 'rgb(252,205,229)',
+    'rgb(217,217,217)', 'rgb(188,128,189)', 'rgb(204,235,197)', 'rgb(255,237,111)'
+]
+PASTEL_COLORS = [
+    'rgb(102, 197, 204)', 'rgb(246, 207, 113)', 'rgb(248, 156, 116)', 'rgb(220, 176, 242)',
+    'rgb(135, 197, 95)', 'rgb(158, 185, 243)', 'rgb(254, 136, 177)', 'rgb(201, 219, 116)',
+    'rgb(139, 224, 164)', 'rgb(180, 151, 231)', 'rgb(179, 179, 179)'
+]
+VIRIDIS_COLORS = [
+    '#440154', '#482878', '#3e4989', '#31688e', '#26828e',
+    '#1f9e89', '#35b779', '#6ece58', '#b5de2b', '#fde725'
+]
+GENDER_COLORS = {
+    'Male': '#2d5ad7', 
+    'Female': '#ec4899', 
+    'LGBTQ': '#24d754'  
+}
+
+# Daily trend is capped at this many points before it reaches the browser
+TREND_MAX_POINTS = 500
+
+# ========== DOWNSAMPLING ==========
+def lttb_indices(x, y, n_out):
+    """
+    Pick the row positions kept by Largest-Triangle-Three-Buckets downsampling
+    
+    Args:
+        x (np.ndarray): Numeric x values, sorted ascending
+        y (np.ndarray): Numeric y values
+        n_out (int): Number of points to keep
+        
+    Returns:
+        np.ndarray: Positions of the kept points (first and last always kept)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = x.astype('float64')
+    y = y.astype('float64')
+    
+    # Interior points are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        
+        # Average of the next bucket (or the last point) is the third vertex
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        # Keep the point forming the largest triangle with prev and the average
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(area.argmax())
+        kept[i + 1] = prev
+    
+    return kept
+
+# ========== CACHED DATA ==========
+@st.cache_resource(ttl=3600, show_spinner="Loading data...")
+def get_data():
+    """
+    Load, clean and summarise the registration data once per hour
+    
+    Cached as a resource so every rerun gets the same frames back; the
+    page only reads them, and compute_chart_frames keys on their identity.
+    
+    Returns:
+        tuple: (df_raw, df_clean, kpis)
+    """
+    # Always use real data (sample_mode=False); shared with Participant Insights
+    df_raw, df_clean = get_clean_data(sample_mode=False)
+    kpis = calculate_kpis(df_clean)
+    return df_raw, df_clean, kpis
+
+# ========== CACHED AGGREGATIONS ==========
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: id})
+def compute_chart_frames(df_clean, df_raw):
+    """
+    Precompute every aggregate the charts need
+    
+    The full-frame scans run once per data load; reruns only look up the
+    small result frames. The frames are keyed by identity, which is stable
+    because get_data returns shared cached objects.
+    
+    Args:
+        df_clean (pd.DataFrame): Cleaned, deduplicated event data
+        df_raw (pd.DataFrame): All registrations with parsed dates
+    
+    Returns:
+        dict: Small DataFrames keyed by chart
+    """
+    frames = {}
+    
+    # Top events by participants, already ranked by value_counts; the
+    # chart's categoryorder puts the highest at the top without a re-sort
+    frames['top_events'] = get_top_categories(df_clean, 'eventName', 15)
+    
+    # Distance categories come out in the dtype's fixed order
+    if 'distance_category' in df_clean.columns:
+        distance_counts = df_clean['distance_category'].cat.remove_unused_categories().value_counts(sort=False).reset_index()
+        distance_counts.columns = ['distance', 'count']
+        frames['distance_counts'] = distance_counts
+        
+        avg_price_by_distance = df_clean.groupby('distance_category', observed=True)['ticketTypePrice'].mean().reset_index()
+        frames['avg_price_by_distance'] = avg_price_by_distance
+    else:
+        avg_price_cat = df_clean.groupby('event_category', observed=True, sort=False)['ticketTypePrice'].mean().reset_index()
+        frames['avg_price_by_category'] = avg_price_cat.sort_values('ticketTypePrice', ascending=False)
+    
+    # Monthly revenue on native datetime bins; empty months count as zero
+    monthly_revenue = df_clean.resample('MS', on='registerDate')['ticketTypePrice'].sum()
+    frames['monthly_revenue'] = monthly_revenue.rename_axis('registerMonth').reset_index()
+    
+    # Per-event participants, revenue and mean price in a single groupby
+    event_stats = df_clean.groupby('eventName', sort=False, observed=True).agg(
+        participants=('ID', 'size'),
+        revenue=('ticketTypePrice', 'sum'),
+        avg_price=('ticketTypePrice', 'mean')
+    ).reset_index()
+    frames['event_stats'] = event_stats
+    
+    # Top 10 revenue-generating events, ascending for horizontal bars
+    revenue_by_event = event_stats.nlargest(10, 'revenue')[['eventName', 'revenue']]
+    revenue_by_event = revenue_by_event.rename(columns={'revenue': 'ticketTypePrice'})
+    frames['revenue_by_event'] = revenue_by_event.sort_values('ticketTypePrice', ascending=True)
+    
+    # Demographics
+    frames['gender'] = df_clean['gender'].cat.remove_unused_categories().value_counts().reset_index()
+    
+    # age_group is an ordered categorical, so sort_index() gives age order
+    known_ages = df_clean.loc[df_clean['age_group'] != 'Unknown', 'age_group'].cat.remove_unused_categories()
+    frames['age'] = known_ages.value_counts().sort_index().reset_index()
+    
+    # price_tier carries every tier as a category; chart only the ones present
+    frames['price_tier'] = df_clean['price_tier'].cat.remove_unused_categories().value_counts().reset_index()
+    
+    # Temporal analysis over ALL registrations (raw data)
+    daily_reg = df_raw.groupby('registerDate').size().reset_index()
+    daily_reg.columns = ['Date', 'Registrations']
+    daily_reg = daily_reg.sort_values('Date').reset_index(drop=True)
+    
+    # Weekday totals from the daily counts - one row per date, not per registration
+    weekday = daily_reg['Date'].dt.day_name().astype(WEEKDAY_DTYPE)
+    weekday_data = daily_reg.groupby(weekday, observed=False)['Registrations'].sum().reset_index()
+    weekday_data.columns = ['Weekday', 'Registrations']
+    frames['weekday'] = weekday_data
+    
+    # Long histories are downsampled so the browser draws a bounded number of points
+    kept = lttb_indices(
+        daily_reg['Date'].to_numpy('datetime64[ns]').astype('int64'),
+        daily_reg['Registrations'].to_numpy(),
+        TREND_MAX_POINTS
+    )
+    frames['daily_reg'] = daily_reg.iloc[kept]
+    
+    return frames
+
 # ========== MAIN CONTENT ==========
 def main():
     # Page header
     st.markdown('<h1 class="main-title">📊 Event Analytics Dashboard</h1>', unsafe_allow_html=True)
     st.markdown("Deep dive into event performance, participant demographics, and revenue trends")
     
-    # Load data
-    with st.spinner("Loading data..."):
-        # Always use real data (sample_mode=False)
-        df_raw = load_data(sample_mode=False)
-        
-        if df_raw is not None:
-            df_clean = clean_event_data(df_raw, verbose=False)
-            kpis = calculate_kpis(df_clean)
-        else:
-            st.error("Failed to load data")
-            return
+    # Load data (cached across reruns)
+    df_raw, df_clean, kpis = get_data()
+    
+    if df_raw is None:
+        st.error("Failed to load data")
+        return
+    
+    frames = compute_chart_frames(df_clean, df_raw)
     
     # ========== KEY INSIGHTS SECTION ==========
     st.markdown('<h2 class="section-title">🔑 Key Insights at a Glance</h2>', unsafe_allow_html=True)
     
-    # Top insights in cards
+    # Top insights in cards - one markdown call per card
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown('<div class="insight-title">Total Revenue</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="insight-value">฿{kpis["total_revenue"]:,.0f}</div>', unsafe_allow_html=True)
-        st.markdown('<div>All events combined</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(
+            '<div class="insight-title">Total Revenue</div>'
+            f'<div class="insight-value">฿{kpis["total_revenue"]:,.0f}</div>'
+            '<div>All events combined</div>',
+            unsafe_allow_html=True
+        )
     
     with col2:
-        st.markdown('<div class="insight-title">Total Unique Participants</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="insight-value">{kpis["total_participants"]:,}</div>', unsafe_allow_html=True)
-        st.markdown('<div>Across all events</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(
+            '<div class="insight-title">Total Unique Participants</div>'
+            f'<div class="insight-value">{kpis["total_participants"]:,}</div>'
+            '<div>Across all events</div>',
+            unsafe_allow_html=True
+        )
     
     with col3:
-        st.markdown('<div class="insight-title">Avg. Ticket Price</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="insight-value">฿{kpis["avg_ticket_price"]:,.0f}</div>', unsafe_allow_html=True)
-        st.markdown('<div>Per participant</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(
+            '<div class="insight-title">Avg. Ticket Price</div>'
+            f'<div class="insight-value">฿{kpis["avg_ticket_price"]:,.0f}</div>'
+            '<div>Per participant</div>',
+            unsafe_allow_html=True
+        )
     
     with col4:
-        st.markdown('<div class="insight-title">Unique Events</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="insight-value">{kpis["unique_events"]}</div>', unsafe_allow_html=True)
-        st.markdown('<div>Different events</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(
+            '<div class="insight-title">Unique Events</div>'
+            f'<div class="insight-value">{kpis["unique_events"]}</div>'
+            '<div>Different events</div>',
+            unsafe_allow_html=True
+        )
     
     # ========== EVENT PERFORMANCE SECTION ==========
     st.markdown('<h2 class="section-title">🏆 Event Performance Analysis</h2>', unsafe_allow_html=True)
@@ -122,39 +307,35 @@ def main():
             st.markdown('<div class="chart-container">', unsafe_allow_html=True)
             st.markdown("**Top 15 Events by Participants**")
             
-            # Top events by participants - sort by highest at the top
-            top_events = get_top_categories(df_clean, 'eventName', 15)
-            
-            # Sort in descending order (highest at top for horizontal bar)
-            top_events = top_events.sort_values('count', ascending=True)  # True for horizontal bars
+            # Top events by participants - highest at the top via categoryorder
+            top_events = frames['top_events']
             
-            fig1 = px.bar(
-                top_events,
-                y='eventName',
-                x='count',
+            fig1 = go.Figure(go.Bar(
+                y=top_events['eventName'],
+                x=top_events['count'],
                 orientation='h',
-                color='count',
-                color_continuous_scale='plasma',
-                title='',
-                labels={'eventName': 'Event Name', 'count': 'Participants'}
-            )
-            
-            # Add value labels on bars
-            fig1.update_traces(
+                marker=dict(
+                    color=top_events['count'],
+                    colorscale='Plasma',
+                    showscale=True,
+                    colorbar=dict(
+                        title="Participants",
+                        thickness=20,
+                        len=0.8
+                    )
+                ),
+                # Add value labels on bars
                 texttemplate='%{x:,}',
-                textposition='outside'
-            )
+                textposition='outside',
+                hovertemplate='Event Name: %{y}<br>Participants: %{x:,}<extra></extra>'
+            ), layout=BASE_LAYOUT)
             
             # Update layout
             fig1.update_layout(
                 height=500,
                 yaxis={'categoryorder': 'total ascending'},  # Highest at top
-                coloraxis_showscale=True,
-                coloraxis_colorbar=dict(
-                    title="Participants",
-                    thickness=20,
-                    len=0.8
-                )
+                xaxis_title='Participants',
+                yaxis_title='Event Name'
             )
             st.plotly_chart(fig1, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
@@ -164,31 +345,21 @@ def main():
             st.markdown("**Distance (KM) Distribution**")
             
             # Distance categories pie/donut chart
-            if 'distance_category' in df_clean.columns:
-                # Define the distance order
-                distance_order = ['5K', '10K', '21.1K', '42.2K', 'Other']
-                
-                # Get counts and reindex to maintain order
-                distance_counts = df_clean['distance_category'].value_counts().reindex(distance_order).reset_index()
-                distance_counts.columns = ['distance', 'count']
+            if 'distance_counts' in frames:
+                distance_counts = frames['distance_counts']
                 
-                # Create donut chart
-                fig2 = px.pie(
-                    distance_counts,
-                    values='count',
-                    names='distance',
+                # Create donut chart; slices keep DISTANCE_ORDER
+                fig2 = go.Figure(go.Pie(
+                    values=distance_counts['count'],
+                    labels=distance_counts['distance'],
                     hole=0.4,
-                    color_discrete_sequence=px.colors.qualitative.Set3,
-                    title='',
-                    category_orders={"distance": distance_order}
-                )
-                
-                # Add percentage labels
-                fig2.update_traces(
+                    sort=False,
+                    marker=dict(colors=SET3_COLORS),
+                    # Add percentage labels
                     textposition='inside',
                     textinfo='percent+label',
                     hovertemplate='Distance: %{label}<br>Participants: %{value}<br>Percentage: %{percent:.1%}<extra></extra>'
-                )
+                ), layout=BASE_LAYOUT)
                 
                 fig2.update_layout(
                     height=500,
@@ -214,20 +385,15 @@ def main():
             st.markdown("**Revenue Trend Over Time**")
             
             # Revenue over time (monthly)
-            df_clean['registerMonth'] = pd.to_datetime(df_clean['registerDate']).dt.to_period('M')
-            monthly_revenue = df_clean.groupby('registerMonth')['ticketTypePrice'].sum().reset_index()
-            monthly_revenue['registerMonth'] = monthly_revenue['registerMonth'].dt.to_timestamp()
-            monthly_revenue = monthly_revenue.sort_values('registerMonth')
+            monthly_revenue = frames['monthly_revenue']
             
-            fig4 = px.line(
-                monthly_revenue,
-                x='registerMonth',
-                y='ticketTypePrice',
-                markers=True,
-                title='',
-                labels={'registerMonth': 'Month', 'ticketTypePrice': 'Monthly Revenue (฿)'}
-            )
-            fig4.update_layout(height=400)
+            fig4 = go.Figure(go.Scattergl(
+                x=monthly_revenue['registerMonth'],
+                y=monthly_revenue['ticketTypePrice'],
+                mode='lines+markers',
+                name=''
+            ), layout=BASE_LAYOUT)
+            fig4.update_layout(height=400, xaxis_title='Month', yaxis_title='Monthly Revenue (฿)')
             st.plotly_chart(fig4, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
         
@@ -236,21 +402,21 @@ def main():
             st.markdown("**Top 10 Revenue-Generating Events**")
             
             # Top revenue events
-            revenue_by_event = df_clean.groupby('eventName')['ticketTypePrice'].sum().reset_index()
-            revenue_by_event = revenue_by_event.sort_values('ticketTypePrice', ascending=False).head(10)
-            revenue_by_event = revenue_by_event.sort_values('ticketTypePrice', ascending=True)  # For horizontal bars
+            revenue_by_event = frames['revenue_by_event']
             
-            fig4 = px.bar(
-                revenue_by_event,
-                y='eventName',
-                x='ticketTypePrice',
+            fig4 = go.Figure(go.Bar(
+                y=revenue_by_event['eventName'],
+                x=revenue_by_event['ticketTypePrice'],
                 orientation='h',
-                color='ticketTypePrice',
-                color_continuous_scale='Viridis',
-                title='',
-                labels={'eventName': 'Event', 'ticketTypePrice': 'Revenue (฿)'}
-            )
-            fig4.update_layout(height=400)
+                marker=dict(
+                    color=revenue_by_event['ticketTypePrice'],
+                    colorscale='Viridis',
+                    showscale=True,
+                    colorbar=dict(title='Revenue (฿)')
+                ),
+                hovertemplate='Event: %{y}<br>Revenue (฿): %{x:,.0f}<extra></extra>'
+            ), layout=BASE_LAYOUT)
+            fig4.update_layout(height=400, xaxis_title='Revenue (฿)', yaxis_title='Event')
             st.plotly_chart(fig4, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
     
@@ -262,37 +428,27 @@ def main():
             st.markdown("**Avg. Price by Distance Category**")
             
             # Average price by distance category
-            if 'distance_category' in df_clean.columns:
-                avg_price_by_distance = df_clean.groupby('distance_category')['ticketTypePrice'].mean().reset_index()
-                avg_price_by_distance = avg_price_by_distance.sort_values('distance_category')
-                
-                fig5 = px.bar(
-                    avg_price_by_distance,
-                    x='distance_category',
-                    y='ticketTypePrice',
-                    color='ticketTypePrice',
-                    color_continuous_scale='Reds',
-                    title='',
-                    labels={'distance_category': 'Distance Category', 'ticketTypePrice': 'Average Price (฿)'}
-                )
-                fig5.update_layout(height=400)
-                st.plotly_chart(fig5, use_container_width=True)
+            if 'avg_price_by_distance' in frames:
+                avg_price = frames['avg_price_by_distance']
+                x_col, x_label = 'distance_category', 'Distance Category'
             else:
                 # Fallback to event category
-                avg_price_cat = df_clean.groupby('event_category')['ticketTypePrice'].mean().reset_index()
-                avg_price_cat = avg_price_cat.sort_values('ticketTypePrice', ascending=False)
-                
-                fig5 = px.bar(
-                    avg_price_cat,
-                    x='event_category',
-                    y='ticketTypePrice',
-                    color='ticketTypePrice',
-                    color_continuous_scale='Reds',
-                    title='',
-                    labels={'event_category': 'Event Category', 'ticketTypePrice': 'Average Price (฿)'}
-                )
-                fig5.update_layout(height=400)
-                st.plotly_chart(fig5, use_container_width=True)
+                avg_price = frames['avg_price_by_category']
+                x_col, x_label = 'event_category', 'Event Category'
+            
+            fig5 = go.Figure(go.Bar(
+                x=avg_price[x_col],
+                y=avg_price['ticketTypePrice'],
+                marker=dict(
+                    color=avg_price['ticketTypePrice'],
+                    colorscale='Reds',
+                    showscale=True,
+                    colorbar=dict(title='Average Price (฿)')
+                ),
+                hovertemplate=x_label + ': %{x}<br>Average Price (฿): %{y:,.0f}<extra></extra>'
+            ), layout=BASE_LAYOUT)
+            fig5.update_layout(height=400, xaxis_title=x_label, yaxis_title='Average Price (฿)')
+            st.plotly_chart(fig5, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col2:
@@ -300,29 +456,27 @@ def main():
             st.markdown("**Participants vs Revenue Scatter**")
             
             # Scatter plot: participants vs revenue
-            event_stats = df_clean.groupby('eventName').agg(
-                participants=('ID', 'count'),
-                revenue=('ticketTypePrice', 'sum'),
-                avg_price=('ticketTypePrice', 'mean')
-            ).reset_index()
+            event_stats = frames['event_stats']
             
-            fig6 = px.scatter(
-                event_stats,
-                x='participants',
-                y='revenue',
-                size='avg_price',
-                color='avg_price',
-                hover_name='eventName',
-                size_max=60,
-                color_continuous_scale='Rainbow',
-                title='',
-                labels={
-                    'participants': 'Number of Participants',
-                    'revenue': 'Total Revenue (฿)',
-                    'avg_price': 'Average Price (฿)'
-                }
-            )
-            fig6.update_layout(height=400)
+            # Bubble area scales with average price, largest bubble 60px across
+            fig6 = go.Figure(go.Scattergl(
+                x=event_stats['participants'],
+                y=event_stats['revenue'],
+                mode='markers',
+                text=event_stats['eventName'],
+                marker=dict(
+                    size=event_stats['avg_price'],
+                    sizemode='area',
+                    sizeref=2.0 * event_stats['avg_price'].max() / 60 ** 2,
+                    color=event_stats['avg_price'],
+                    colorscale='Rainbow',
+                    showscale=True,
+                    colorbar=dict(title='Average Price (฿)')
+                ),
+                hovertemplate='<b>%{text}</b><br>Number of Participants: %{x:,}<br>'
+                              'Total Revenue (฿): %{y:,.0f}<br>Average Price (฿): %{marker.color:,.0f}<extra></extra>'
+            ), layout=BASE_LAYOUT)
+            fig6.update_layout(height=400, xaxis_title='Number of Participants', yaxis_title='Total Revenue (฿)')
             st.plotly_chart(fig6, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
     
@@ -335,18 +489,13 @@ def main():
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown("**Gender Distribution**")
         
-        gender_data = df_clean['gender'].value_counts().reset_index()
-        fig7 = px.pie(
-            gender_data,
-            values='count',
-            names='gender',
+        gender_data = frames['gender']
+        fig7 = go.Figure(go.Pie(
+            values=gender_data['count'],
+            labels=gender_data['gender'],
             hole=0.3,
-            color_discrete_map={
-                'Male': '#2d5ad7', 
-                'Female': '#ec4899', 
-                'LGBTQ': '#24d754'  
-            }
-        )
+            marker=dict(colors=gender_data['gender'].astype(str).map(GENDER_COLORS).tolist())
+        ), layout=BASE_LAYOUT)
         fig7.update_layout(height=350)
         st.plotly_chart(fig7, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
@@ -355,28 +504,20 @@ def main():
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown("**Age Group Distribution**")
         
-        # Filter out "Unknown" age groups
-        age_data = df_clean[df_clean['age_group'] != 'Unknown']['age_group'].value_counts().reset_index()
-        
-        # Define the order for age groups
-        age_order = ['<18', '18-24', '25-34', '35-44', '45-54', '55+']
-        age_data['age_group'] = pd.Categorical(age_data['age_group'], categories=age_order, ordered=True)
-        age_data = age_data.sort_values('age_group')
+        # Known age groups only, in age order
+        age_data = frames['age']
         
-        fig8 = px.bar(
-            age_data,
-            x='age_group',
-            y='count',
-            color='age_group',
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-            title='',
-            labels={'age_group': 'Age Group', 'count': 'Participants'}
-        )
+        fig8 = go.Figure(go.Bar(
+            x=age_data['age_group'],
+            y=age_data['count'],
+            marker_color=[PASTEL_COLORS[i % len(PASTEL_COLORS)] for i in range(len(age_data))],
+            hovertemplate='Age Group: %{x}<br>Participants: %{y:,}<extra></extra>'
+        ), layout=BASE_LAYOUT)
         fig8.update_layout(
             height=350, 
             xaxis_title="Age Group", 
             yaxis_title="Participants",
-            xaxis={'categoryorder': 'array', 'categoryarray': age_order}
+            xaxis={'categoryorder': 'array', 'categoryarray': AGE_ORDER}
         )
         st.plotly_chart(fig8, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
@@ -385,16 +526,13 @@ def main():
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown("**Price Tier Preferences**")
         
-        price_tier_data = df_clean['price_tier'].value_counts().reset_index()
-        fig9 = px.bar(
-            price_tier_data,
-            x='price_tier',
-            y='count',
-            color='price_tier',
-            color_discrete_sequence=px.colors.sequential.Viridis,
-            title='',
-            labels={'price_tier': 'Price Tier', 'count': 'Participants'}
-        )
+        price_tier_data = frames['price_tier']
+        fig9 = go.Figure(go.Bar(
+            x=price_tier_data['price_tier'],
+            y=price_tier_data['count'],
+            marker_color=[VIRIDIS_COLORS[i % len(VIRIDIS_COLORS)] for i in range(len(price_tier_data))],
+            hovertemplate='Price Tier: %{x}<br>Participants: %{y:,}<extra></extra>'
+        ), layout=BASE_LAYOUT)
         fig9.update_layout(height=350, xaxis_title="Price Tier", yaxis_title="Participants")
         st.plotly_chart(fig9, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
@@ -409,20 +547,20 @@ def main():
         st.markdown("**Daily Registration Trend**")
         
         # Daily registrations - Use ALL registrations (raw data)
-        df_raw['registerDate'] = pd.to_datetime(df_raw['registerDate'], errors='coerce')
-        daily_reg = df_raw.groupby('registerDate').size().reset_index()
-        daily_reg.columns = ['Date', 'Registrations']
-        daily_reg = daily_reg.sort_values('Date')
+        daily_reg = frames['daily_reg']
         
-        fig10 = px.line(
-            daily_reg,
-            x='Date',
-            y='Registrations',
-            markers=True,
-            title='',
-            labels={'Date': 'Date', 'Registrations': 'Daily Registrations'}
+        # WebGL trace - SVG markers get slow past ~1k points
+        fig10 = go.Figure(go.Scattergl(
+            x=daily_reg['Date'],
+            y=daily_reg['Registrations'],
+            mode='lines+markers',
+            name=''
+        ), layout=BASE_LAYOUT)
+        fig10.update_layout(
+            height=350,
+            xaxis_title='Date',
+            yaxis_title='Daily Registrations'
         )
-        fig10.update_layout(height=350)
         st.plotly_chart(fig10, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -431,23 +569,20 @@ def main():
         st.markdown("**Registration by Weekday**")
         
         # Registrations by weekday - Use ALL registrations (raw data)
-        df_raw['registerDate'] = pd.to_datetime(df_raw['registerDate'], errors='coerce')
-        df_raw['weekday'] = df_raw['registerDate'].dt.day_name()
+        weekday_data = frames['weekday']
         
-        weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        weekday_data = df_raw['weekday'].value_counts().reindex(weekday_order).reset_index()
-        weekday_data.columns = ['Weekday', 'Registrations']
-        
-        fig11 = px.bar(
-            weekday_data,
-            x='Weekday',
-            y='Registrations',
-            color='Registrations',
-            color_continuous_scale='Sunset',
-            title='',
-            labels={'Weekday': 'Day of Week', 'Registrations': 'Number of Registrations'}
-        )
-        fig11.update_layout(height=350)
+        fig11 = go.Figure(go.Bar(
+            x=weekday_data['Weekday'],
+            y=weekday_data['Registrations'],
+            marker=dict(
+                color=weekday_data['Registrations'],
+                colorscale='Sunset',
+                showscale=True,
+                colorbar=dict(title='Registrations')
+            ),
+            hovertemplate='Day of Week: %{x}<br>Number of Registrations: %{y:,}<extra></extra>'
+        ), layout=BASE_LAYOUT)
+        fig11.update_layout(height=350, xaxis_title='Day of Week', yaxis_title='Number of Registrations')
         st.plotly_chart(fig11, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
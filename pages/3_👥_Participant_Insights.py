@@ -2,13 +2,13 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from functools import partial
 import sys
 import os
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-from data_loader import load_data
-from preprocessing import clean_event_data
+from data_loader import get_clean_data
 
 # Page configuration
 st.set_page_config(
@@ -21,20 +21,96 @@ st.set_page_config(
 st.title("👥Participant Insights")
 st.markdown("Analyze participant registration patterns and identify inactive users")
 
-# Load data
-@st.cache_data
+# Candidate columns for the participant event table, in display order
+DETAIL_COLUMNS = ('eventName', 'registerDate', 'Distance (KM)', 'Price',
+                  'distance', 'price', 'event_name', 'distance_km', 'price_usd')
+
+# Load data - shared by reference across reruns and sessions, so the
+# frames must be treated as read-only by everything below. Expires with
+# get_clean_data so a new data file reaches this page too
+@st.cache_resource(ttl=3600, show_spinner=False)
 def load_and_process_data():
     try:
-        df_raw = load_data(sample_mode=False)
+        df_raw, df_processed = get_clean_data(sample_mode=False)
     except:
-        df_raw = load_data(sample_mode=True)
+        df_raw, df_processed = get_clean_data(sample_mode=True)
+    
+    # Categorical IDs let groupby bucket on integer codes
+    if 'ID' in df_processed.columns:
+        df_processed['ID'] = df_processed['ID'].astype('category')
     
-    df_processed = clean_event_data(df_raw, verbose=False)
     return df_raw, df_processed
 
+@st.cache_data
+def to_csv_bytes(results):
+    """Encode a results table as CSV bytes once per distinct table"""
+    return results.to_csv(index=False).encode('utf-8')
+
+# Keyed by identity: df is the shared object from load_and_process_data
+@st.cache_data(ttl=3600, hash_funcs={pd.DataFrame: id})
+def get_participant_stats(df):
+    """Last registration date, registration count and days inactive per ID"""
+    # One linear pass over the categorical ID codes: bincount for the
+    # counts, np.maximum.at for the latest date - no ID string hashing
+    codes = df['ID'].cat.codes.to_numpy()
+    dates = df['registerDate'].to_numpy('datetime64[ns]').view('i8')
+    valid = codes >= 0
+    codes, dates = codes[valid], dates[valid]
+    n_ids = len(df['ID'].cat.categories)
+    
+    counts = np.bincount(codes, minlength=n_ids)
+    last_reg = np.full(n_ids, np.iinfo(np.int64).min)  # int64 min is NaT
+    np.maximum.at(last_reg, codes, dates)
+    
+    # Keep only IDs that actually occur (same as observed=True)
+    seen = np.flatnonzero(counts)
+    participant_stats = pd.DataFrame({
+        'ID': pd.Categorical.from_codes(seen, dtype=df['ID'].dtype),
+        'last_reg_date': last_reg[seen].view('datetime64[ns]'),
+        'registration_count': counts[seen]
+    })
+    
+    # Whole-day difference on the datetime64 values; IDs without a valid
+    # date (NaT) get NaN instead of a wrapped-around integer
+    today = np.datetime64(datetime.now().date(), 'D')
+    last = participant_stats['last_reg_date'].to_numpy().astype('datetime64[D]')
+    days = (today - last).astype(np.int64)
+    missing = np.isnat(last)
+    participant_stats['days_since_last'] = np.where(missing, np.nan, days) if missing.any() else days.astype(np.int32)
+    return participant_stats
+
+def session_participant_stats(df):
+    """Per-session handle on get_participant_stats, reused until the day changes"""
+    # Skips the cache lookup and the unpickled copy cache_data returns on
+    # every rerun. One slot per session, replaced when the frame or the
+    # date changes, so days_since_last stays current and old stats go
+    frame_id, today = id(df), datetime.now().date()
+    cached = st.session_state.get('participant_stats')
+    if cached is None or cached[:2] != (frame_id, today):
+        cached = (frame_id, today, get_participant_stats(df))
+        st.session_state['participant_stats'] = cached
+    return cached[2]
+
+# Keyed by identity; the ttl lets indexes for replaced frames expire
+@st.cache_resource(ttl=3600, hash_funcs={pd.DataFrame: id})
+def build_id_index(df):
+    """Row positions of each ID's events, so a lookup skips the full-column scan"""
+    return df.groupby('ID', observed=True, sort=False).indices
+
 with st.spinner("Loading..."):
     df_raw, df = load_and_process_data()
 
+# Styles for the result-size controls, shared by both tabs
+st.markdown("""
+<style>
+.inline-label {
+    white-space: nowrap;
+    font-weight: 600;
+    padding-top: 8px;
+}
+</style>
+""", unsafe_allow_html=True)
+
 # Create two clickable tabs/buttons
 st.markdown("---")
 col1, col2 = st.columns(2)
@@ -49,17 +125,12 @@ if 'show_least_active_results' not in st.session_state:
 if 'show_least_registration_results' not in st.session_state:
     st.session_state.show_least_registration_results = False
 
-# Store selected ID in session state
-if 'selected_id' not in st.session_state:
-    st.session_state.selected_id = None
-
 # Tab 1: Least Active
 with col1:
     if st.button("**Least Active**", use_container_width=True, 
                  type="primary" if st.session_state.active_tab == 'Least Active' else "secondary"):
         st.session_state.active_tab = 'Least Active'
         st.session_state.show_least_active_results = False
-        st.session_state.selected_id = None
         st.rerun()
 
 # Tab 2: Least Registration
@@ -68,56 +139,58 @@ with col2:
                  type="primary" if st.session_state.active_tab == 'Least Registration' else "secondary"):
         st.session_state.active_tab = 'Least Registration'
         st.session_state.show_least_registration_results = False
-        st.session_state.selected_id = None
         st.rerun()
 
 st.markdown("---")
 
+# Result-size dropdown and Show Results button used by both tabs
+def render_controls(dropdown_key, button_key):
+    """Render the results controls and return (results_limit, clicked)"""
+    # Label
+    st.markdown('<div class="inline-label">Show first N results:</div>', unsafe_allow_html=True)
+    
+    # Dropdown
+    results_limit = st.selectbox(
+        "",
+        [100, 250, 500, 1000], 
+        index=2,
+        label_visibility="collapsed",
+        key=dropdown_key
+    )
+    
+    # Button
+    clicked = st.button("Show Results", type="primary", key=button_key)
+    return results_limit, clicked
+
 # Function to show participant details
 def show_participant_details(participant_id):
     """Display participant event details"""
     st.markdown(f"**ID**: {participant_id}")
     
-    # Use the processed data (df) for consistency
-    participant_data = df[df['ID'] == participant_id].copy()
+    # Use the processed data (df) for consistency; only this ID's rows are touched
+    positions = build_id_index(df).get(participant_id, [])
+    participant_data = df.iloc[positions]
     
     if len(participant_data) > 0:
-        # Clean and sort data
-        participant_data['registerDate'] = pd.to_datetime(participant_data['registerDate'], errors='coerce')
-        participant_data = participant_data.sort_values('registerDate', ascending=True)
-        
-        # Define display columns - check what's available in the processed data
-        possible_columns = ['eventName', 'registerDate', 'Distance (KM)', 'Price', 
-                           'distance', 'price', 'event_name', 'distance_km', 'price_usd']
+        # Sort data; registerDate is already datetime64 from get_clean_data
+        participant_data = participant_data.sort_values('registerDate', ascending=True, kind='mergesort')
         
-        # Find which columns actually exist in the data
-        available_cols = []
-        for col in possible_columns:
-            if col in participant_data.columns:
-                available_cols.append(col)
-        
-        # Always include ID and eventName if available
-        for essential_col in ['eventName', 'ID']:
-            if essential_col in participant_data.columns and essential_col not in available_cols:
-                available_cols.insert(0, essential_col)
+        # Display columns that exist in the processed data, ID first if available
+        columns = participant_data.columns
+        available_cols = [col for col in DETAIL_COLUMNS if col in columns]
+        if 'ID' in columns:
+            available_cols.insert(0, 'ID')
         
         if len(available_cols) == 0:
             st.info("No displayable columns found for this participant")
             return
         
-        # Display as table
-        display_data = participant_data[available_cols].copy()
-        
-        # Format dates if present
-        if 'registerDate' in display_data.columns:
-            display_data['registerDate'] = display_data['registerDate'].dt.strftime('%Y/%m/%d')
-        
-        # Reset index
-        display_data = display_data.reset_index(drop=True)
-        
-        # Display as dataframe for better formatting
+        # Display as dataframe; the browser formats the dates
         st.dataframe(
-            display_data,
+            participant_data[available_cols],
+            column_config={
+                'registerDate': st.column_config.DateColumn(format='YYYY/MM/DD')
+            },
             use_container_width=True,
             hide_index=True
         )
@@ -127,14 +200,15 @@ def show_participant_details(participant_id):
         col1, col2, col3 = st.columns(3)
         with col1:
             st.metric("Total Events", len(participant_data))
-        with col2:
-            if 'registerDate' in participant_data.columns:
-                first_event = participant_data['registerDate'].min()
-                st.metric("First Event", first_event.strftime('%Y/%m/%d'))
-        with col3:
-            if 'registerDate' in participant_data.columns:
-                last_event = participant_data['registerDate'].max()
-                st.metric("Last Event", last_event.strftime('%Y/%m/%d'))
+        
+        if 'registerDate' in participant_data.columns:
+            # Format first and last dates in one numpy call; NaT shows as 'NaT'
+            date_range = participant_data['registerDate'].agg(['min', 'max']).to_numpy('datetime64[D]')
+            first_event, last_event = np.char.replace(np.datetime_as_string(date_range, unit='D'), '-', '/')
+            with col2:
+                st.metric("First Event", first_event)
+            with col3:
+                st.metric("Last Event", last_event)
         
     else:
         st.info("No event data found for this participant")
@@ -143,75 +217,26 @@ def show_participant_details(participant_id):
 if st.session_state.active_tab == 'Least Active':
     st.markdown("### Least Active")
     
-    # Create a horizontal layout with proper alignment
-    st.markdown("""
-    <style>
-    .inline-container {
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        margin-bottom: 1rem;
-    }
-    .inline-label {
-        white-space: nowrap;
-        font-weight: 600;
-        padding-top: 8px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Create the inline layout
-    st.markdown('<div class="inline-container">', unsafe_allow_html=True)
-    
-    # Label
-    st.markdown('<div class="inline-label">Show first N results:</div>', unsafe_allow_html=True)
-    
-    # Dropdown
-    results_limit = st.selectbox(
-        "",
-        [100, 250, 500, 1000], 
-        index=2,
-        label_visibility="collapsed",
-        key="least_active_dropdown"
-    )
-    
-    # Button
-    if st.button("Show Results", 
-               type="primary", 
-               key="show_least_active_btn"):
+    results_limit, show_clicked = render_controls("least_active_dropdown", "show_least_active_btn")
+    if show_clicked:
         st.session_state.show_least_active_results = True
         st.session_state.show_least_registration_results = False
-        st.session_state.selected_id = None
         st.rerun()
     
-    st.markdown('</div>', unsafe_allow_html=True)
-    
     if st.session_state.show_least_active_results:
         if 'registerDate' not in df.columns or 'ID' not in df.columns:
             st.error("Required columns 'registerDate' or 'ID' not found in processed data!")
             st.stop()
         
-        df['registerDate'] = pd.to_datetime(df['registerDate'], errors='coerce')
-        
-        # Calculate stats
-        participant_stats = df.groupby('ID').agg({
-            'registerDate': 'max',
-            'eventName': 'count'
-        }).reset_index()
-        
-        participant_stats.columns = ['ID', 'last_reg_date', 'registration_count']
-        
-        current_date = datetime.now()
-        participant_stats['days_since_last'] = (current_date - participant_stats['last_reg_date']).dt.days
+        # Per-ID stats are cached; only the filter below runs per click
+        participant_stats = session_participant_stats(df)
         
         # Use fixed inactivity threshold (180 days)
         inactivity_threshold = 180
-        participant_stats['is_inactive'] = participant_stats['days_since_last'] > inactivity_threshold
         
-        # Filter inactive participants
-        inactive_ids = participant_stats[participant_stats['is_inactive'] == True].copy()
-        inactive_ids = inactive_ids.sort_values('days_since_last', ascending=False)
-        results = inactive_ids.head(results_limit)
+        # Filter to inactive participants first, then keep the longest inactive
+        inactive_ids = participant_stats.loc[participant_stats['days_since_last'] > inactivity_threshold]
+        results = inactive_ids.nlargest(results_limit, 'days_since_last')
         
         # Display results section
         st.markdown("---")
@@ -220,25 +245,31 @@ if st.session_state.active_tab == 'Least Active':
             st.info(f"No participants found inactive for more than {inactivity_threshold} days")
         else:
             # Display header
-            st.markdown(f"**Showing first {len(results)} inactive IDs:**")
+            st.markdown(f"**Showing first {len(results)} inactive IDs** (select a row to see its events):")
             
-            # Create a list of IDs with selectable format
-            for idx, row in results.iterrows():
-                # Create a unique key for each button
-                if st.button(f"{row['ID']} ({row['registration_count']} events, {row['days_since_last']} days inactive)", 
-                            key=f"least_active_{row['ID']}",
-                            use_container_width=True,
-                            type="secondary"):
-                    st.session_state.selected_id = row['ID']
-                    st.rerun()
-                
-                # Show details immediately below the selected ID
-                if st.session_state.selected_id == row['ID']:
-                    show_participant_details(row['ID'])
+            # One selectable table instead of a button per ID; the key
+            # includes N so a new result size starts with no selection
+            table = st.dataframe(
+                results[['ID', 'registration_count', 'days_since_last']],
+                column_config={
+                    'registration_count': st.column_config.NumberColumn('Events'),
+                    'days_since_last': st.column_config.NumberColumn('Days Inactive')
+                },
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                key=f"least_active_table_{results_limit}"
+            )
+            
+            # Show details below the table for the selected ID
+            if table.selection.rows:
+                show_participant_details(results['ID'].iloc[table.selection.rows[0]])
             
             # Download button at the bottom
             st.markdown("---")
-            csv_data = results[['ID', 'last_reg_date', 'days_since_last', 'registration_count']].to_csv(index=False)
+            # Bytes are built only when the button is clicked
+            csv_data = partial(to_csv_bytes, results[['ID', 'last_reg_date', 'days_since_last', 'registration_count']])
             st.download_button(
                 label=f"Download {len(results)} IDs",
                 data=csv_data,
@@ -250,70 +281,22 @@ if st.session_state.active_tab == 'Least Active':
 elif st.session_state.active_tab == 'Least Registration':
     st.markdown("### Least Registration")
     
-    # Create a horizontal layout with proper alignment
-    st.markdown("""
-    <style>
-    .inline-container {
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        margin-bottom: 1rem;
-    }
-    .inline-label {
-        white-space: nowrap;
-        font-weight: 600;
-        padding-top: 8px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Create the inline layout
-    st.markdown('<div class="inline-container">', unsafe_allow_html=True)
-    
-    # Label
-    st.markdown('<div class="inline-label">Show first N results:</div>', unsafe_allow_html=True)
-    
-    # Dropdown
-    results_limit = st.selectbox(
-        "",
-        [100, 250, 500, 1000], 
-        index=2,
-        label_visibility="collapsed",
-        key="least_reg_dropdown"
-    )
-    
-    # Button
-    if st.button("Show Results", 
-               type="primary", 
-               key="show_least_registration_btn"):
+    results_limit, show_clicked = render_controls("least_reg_dropdown", "show_least_registration_btn")
+    if show_clicked:
         st.session_state.show_least_registration_results = True
         st.session_state.show_least_active_results = False
-        st.session_state.selected_id = None
         st.rerun()
     
-    st.markdown('</div>', unsafe_allow_html=True)
-    
     if st.session_state.show_least_registration_results:
         if 'registerDate' not in df.columns or 'ID' not in df.columns:
             st.error("Required columns 'registerDate' or 'ID' not found in processed data!")
             st.stop()
         
-        df['registerDate'] = pd.to_datetime(df['registerDate'], errors='coerce')
-        
-        # Calculate stats
-        participant_stats = df.groupby('ID').agg({
-            'registerDate': 'max',
-            'eventName': 'count'
-        }).reset_index()
+        # Per-ID stats are cached; only the filter below runs per click
+        participant_stats = session_participant_stats(df)
         
-        participant_stats.columns = ['ID', 'last_reg_date', 'registration_count']
-        
-        current_date = datetime.now()
-        participant_stats['days_since_last'] = (current_date - participant_stats['last_reg_date']).dt.days
-        
-        # Sort by registration count ONLY (not by inactivity)
-        least_reg_ids = participant_stats.sort_values(['registration_count'], ascending=[True])
-        results = least_reg_ids.head(results_limit)
+        # Rank by registration count ONLY (not by inactivity)
+        results = participant_stats.nsmallest(results_limit, 'registration_count')
         
         # Display results section
         st.markdown("---")
@@ -322,25 +305,30 @@ elif st.session_state.active_tab == 'Least Registration':
             st.info("No participant data found")
         else:
             # Display header
-            st.markdown(f"**Showing first {len(results)} IDs with fewest registrations:**")
+            st.markdown(f"**Showing first {len(results)} IDs with fewest registrations** (select a row to see its events):")
+            
+            # One selectable table instead of a button per ID
+            table = st.dataframe(
+                results[['ID', 'registration_count', 'last_reg_date']],
+                column_config={
+                    'registration_count': st.column_config.NumberColumn('Events'),
+                    'last_reg_date': st.column_config.DateColumn('Last Registration', format='YYYY/MM/DD')
+                },
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                key=f"least_reg_table_{results_limit}"
+            )
             
-            # Create a list of IDs with selectable format
-            for idx, row in results.iterrows():
-                # Create a unique key for each button
-                if st.button(f"{row['ID']} ({row['registration_count']} events)", 
-                            key=f"least_reg_{row['ID']}",
-                            use_container_width=True,
-                            type="secondary"):
-                    st.session_state.selected_id = row['ID']
-                    st.rerun()
-                
-                # Show details immediately below the selected ID
-                if st.session_state.selected_id == row['ID']:
-                    show_participant_details(row['ID'])
+            # Show details below the table for the selected ID
+            if table.selection.rows:
+                show_participant_details(results['ID'].iloc[table.selection.rows[0]])
             
             # Download button at the bottom
             st.markdown("---")
-            csv_data = results[['ID', 'registration_count', 'last_reg_date']].to_csv(index=False)
+            # Bytes are built only when the button is clicked
+            csv_data = partial(to_csv_bytes, results[['ID', 'registration_count', 'last_reg_date']])
             st.download_button(
                 label=f"Download {len(results)} IDs",
                 data=csv_data,
@@ -0,0 +1,37 @@
+"""
+csv_to_parquet.py - One-time conversion of the raw CSV export to Parquet
+
+Usage:
+    python scripts/csv_to_parquet.py [csv_path] [parquet_path]
+"""
+import os
+import sys
+import pandas as pd
+
+DEFAULT_CSV_PATH = 'data/raw/bkk_data_final.csv'
+
+def convert(csv_path=DEFAULT_CSV_PATH, parquet_path=None):
+    """
+    Convert a registration CSV to a zstd-compressed Parquet file
+    
+    Args:
+        csv_path (str): Path to source CSV file
+        parquet_path (str): Output path, defaults to csv_path with .parquet suffix
+    
+    Returns:
+        str: Path of the written Parquet file
+    """
+    if parquet_path is None:
+        parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    
+    try:
+        df = pd.read_csv(csv_path, encoding='utf-8')
+    except UnicodeDecodeError:
+        df = pd.read_csv(csv_path, encoding='latin-1')
+    
+    df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    print(f"💾 Wrote {len(df):,} rows to: {parquet_path}")
+    return parquet_path
+
+if __name__ == "__main__":
+    convert(*sys.argv[1:3])
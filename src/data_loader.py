@@ -3,15 +3,26 @@
 data_loader.py - Handles data loading and basic operations
 """
 import pandas as pd
+from pandas.api.types import union_categoricals
 import numpy as np
 import os
-from datetime import datetime, timedelta
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import streamlit as st
 
-def load_data(filepath='data/raw/bkk_data_final.csv', sample_mode=False):
+from preprocessing import clean_event_data
+
+# Raw registration export shared by every page
+DATA_PATH = 'data/raw/bkk_data_final.csv'
+
+def load_data(filepath=DATA_PATH, sample_mode=False):
     """
     Load event registration data from CSV file
     
+    An up-to-date Parquet copy next to the CSV (see get_parquet_path) is
+    read instead when one exists.
+    
     Args:
         filepath (str): Path to CSV file
         sample_mode (bool): If True, creates sample data for testing
@@ -24,20 +35,40 @@ def load_data(filepath='data/raw/bkk_data_final.csv', sample_mode=False):
             st.info("🔧 Using sample data for testing")
             return create_sample_data()
         
+        parquet_path = get_parquet_path(filepath)
+        
         # Check if file exists
-        if not os.path.exists(filepath):
+        if parquet_path is None and not os.path.exists(filepath):
             st.error(f"❌ Data file not found: {filepath}")
             st.info("Switching to sample data mode")
             return create_sample_data()
         
-        # Load CSV with proper encoding
-        st.info(f"📂 Loading data from: {filepath}")
+        if parquet_path is not None:
+            # Columnar binary read, no text parsing
+            st.info(f"📂 Loading data from: {parquet_path}")
+            df = pd.read_parquet(parquet_path, engine='pyarrow')
+        else:
+            # Load CSV with proper encoding
+            st.info(f"📂 Loading data from: {filepath}")
+            
+            # pyarrow's multithreaded reader; text that is not valid UTF-8
+            # comes back as binary columns, so retry those files as latin-1
+            convert_options = pv.ConvertOptions(strings_can_be_null=True)
+            table = pv.read_csv(filepath, convert_options=convert_options)
+            if any(pa.types.is_binary(field.type) for field in table.schema):
+                table = pv.read_csv(
+                    filepath,
+                    read_options=pv.ReadOptions(encoding='latin-1'),
+                    convert_options=convert_options
+                )
+            # Columns Arrow already parsed as ISO dates come out as datetime64
+            # rather than Python date objects that to_datetime must walk one by one
+            df = table.to_pandas(date_as_object=False)
         
-        # Try different encodings if needed
-        try:
-            df = pd.read_csv(filepath, encoding='utf-8')
-        except UnicodeDecodeError:
-            df = pd.read_csv(filepath, encoding='latin-1')
+        # Repeated labels become integer-coded categoricals
+        for col in RAW_CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
         
         # Basic validation
         st.success(f"✅ Loaded {len(df):,} rows with {len(df.columns)} columns")
@@ -49,6 +80,222 @@ def load_data(filepath='data/raw/bkk_data_final.csv', sample_mode=False):
         st.info("Creating sample data for testing...")
         return create_sample_data()
 
+def get_parquet_path(csv_path):
+    """
+    Return the Parquet file that sits next to a CSV, if it is usable
+    
+    The Parquet copy is only used when it is at least as new as the CSV,
+    so a freshly replaced CSV is never shadowed by a stale conversion.
+    
+    Args:
+        csv_path (str): Path to CSV file
+    
+    Returns:
+        str or None: Parquet path, or None if there is no up-to-date copy
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    if not os.path.exists(parquet_path):
+        return None
+    if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(parquet_path):
+        return None
+    return parquet_path
+
+def count_file_columns(path):
+    """
+    Count the columns in the data file from its header alone
+    
+    load_bkk_data only reads BKK_COLUMNS, so the loaded frame does not
+    describe the file; this reads the Parquet schema or the CSV header
+    without loading any rows.
+    
+    Args:
+        path (str): Path to CSV file
+    
+    Returns:
+        int: Number of columns in the file
+    """
+    parquet_path = get_parquet_path(path)
+    if parquet_path is not None:
+        return len(pq.read_schema(parquet_path).names)
+    return len(pd.read_csv(path, nrows=0).columns)
+
+# Columns read by load_bkk_data; everything else in the export is skipped
+BKK_COLUMNS = ['ID', 'eventName', 'ticketTypePrice', 'gender', 'registerDate', 'age']
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORY_COLUMNS = ['gender', 'eventName']
+
+# Text columns load_data converts to categoricals; ID repeats once per
+# registration, so groupbys and lookups on it run on integer codes
+RAW_CATEGORY_COLUMNS = [
+    'ID', 'eventName', 'gender', 'province', 'ticketTypeName',
+    'shirtType', 'shirtSize', 'country', 'city'
+]
+
+# Rows parsed per CSV chunk; bounds parser scratch memory on large exports
+CSV_CHUNKSIZE = 200_000
+
+def optimize_dtypes(df):
+    """
+    Shrink the memory footprint of a registration DataFrame in place
+    
+    Args:
+        df (pd.DataFrame): Loaded registration data
+    
+    Returns:
+        pd.DataFrame: Same frame with compact dtypes
+    """
+    if 'registerDate' in df.columns:
+        df['registerDate'] = pd.to_datetime(df['registerDate'], errors='coerce')
+    
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    
+    # Integer prices fit in int16/int32; prices with satang stay float64
+    if 'ticketTypePrice' in df.columns:
+        df['ticketTypePrice'] = pd.to_numeric(df['ticketTypePrice'], errors='coerce', downcast='integer')
+    
+    # IDs are near-unique, so Arrow strings beat categoricals here
+    if 'ID' in df.columns:
+        df['ID'] = df['ID'].astype('string[pyarrow]')
+    
+    return df
+
+def read_csv_chunked(path, usecols=None, chunksize=CSV_CHUNKSIZE):
+    """
+    Read a CSV in chunks, compacting each chunk before the next is parsed
+    
+    Peak memory is bounded by one raw chunk plus the already-compacted
+    rows, instead of the whole file as object-dtype strings.
+    
+    Args:
+        path (str): Path to CSV file
+        usecols (list or callable): Columns to read, as for pd.read_csv
+        chunksize (int): Rows per chunk
+    
+    Returns:
+        pd.DataFrame: Concatenated data with compact dtypes
+    """
+    chunks = [optimize_dtypes(chunk)
+              for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize)]
+    
+    if not chunks:
+        return optimize_dtypes(pd.read_csv(path, usecols=usecols, nrows=0))
+    
+    # Align categories across chunks so concat keeps the categorical dtype
+    for col in CATEGORY_COLUMNS:
+        if col in chunks[0].columns:
+            categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    
+    return pd.concat(chunks, ignore_index=True)
+
+@st.cache_resource(show_spinner="Loading data...")
+def load_bkk_data(path):
+    """
+    Load the registration data once and share it across reruns and sessions
+    
+    Reads the Parquet copy produced by scripts/csv_to_parquet.py when one
+    exists, falling back to parsing the CSV. Only BKK_COLUMNS are read
+    (missing ones are skipped). The frame is cached as a
+    resource, so every caller gets the same object back without a
+    per-call copy; callers must treat it as read-only.
+    
+    Args:
+        path (str): Path to CSV file
+    
+    Returns:
+        pd.DataFrame: Loaded data with registerDate parsed to datetime
+            and compact dtypes applied
+    """
+    parquet_path = get_parquet_path(path)
+    if parquet_path is not None:
+        available = set(pq.read_schema(parquet_path).names)
+        columns = [col for col in BKK_COLUMNS if col in available]
+        df = pd.read_parquet(parquet_path, engine='pyarrow', columns=columns)
+        return optimize_dtypes(df)
+    
+    return read_csv_chunked(path, usecols=lambda col: col in BKK_COLUMNS)
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: id})
+def compute_kpis(df):
+    """
+    Compute the headline metrics shown on the Home and Overview pages
+    
+    Cached so the full-column scans run once per data load instead of on
+    every widget interaction. The frame is keyed by identity, which is
+    stable because load_bkk_data returns a shared cached object.
+    
+    Args:
+        df (pd.DataFrame): Raw registration data from load_bkk_data
+    
+    Returns:
+        dict: Registration counts, revenue figures, in-memory size and
+            top categories
+    """
+    has_price = 'ticketTypePrice' in df.columns
+    kpis = {
+        'total_registrations': len(df),
+        'unique_participants': df['ID'].nunique() if 'ID' in df.columns else "N/A",
+        'total_revenue': df['ticketTypePrice'].sum() if has_price else 0,
+        'avg_ticket_price': df['ticketTypePrice'].mean() if has_price else 0,
+        # deep=True counts string payloads too; cheap on compact dtypes
+        'memory_kb': df.memory_usage(deep=True).sum() / 1024,
+    }
+    
+    if 'eventName' in df.columns:
+        kpis['top_events'] = df['eventName'].value_counts().head(10)
+    
+    # Gender counts over unique participants (first registration per ID);
+    # only the two needed columns are deduplicated, not the whole frame
+    if 'gender' in df.columns and 'ID' in df.columns:
+        unique_gender = df[['ID', 'gender']].drop_duplicates(subset=['ID'], keep='first')['gender']
+        kpis['gender_counts'] = unique_gender.value_counts()
+    
+    return kpis
+
+@st.cache_resource(show_spinner=False, hash_funcs={pd.DataFrame: id})
+def get_preview_table(df, n=100):
+    """
+    First rows of the loaded data as a cached Arrow table
+    
+    st.dataframe sends Arrow to the browser; handing it a ready-made
+    table skips the pandas to Arrow conversion on every rerun.
+    
+    Args:
+        df (pd.DataFrame): Data from load_bkk_data
+        n (int): Number of rows to preview
+    
+    Returns:
+        pa.Table: Preview rows without the pandas index
+    """
+    return pa.Table.from_pandas(df.iloc[:n], preserve_index=False)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_clean_data(sample_mode=False):
+    """
+    Load and clean the event data once for all analytics pages
+    
+    Event Analytics and Participant Insights both call this, so switching
+    pages hits the same cache entry instead of re-reading the file. The
+    hourly ttl matches get_data, so an updated CSV/Parquet file is picked
+    up without restarting the server.
+    
+    Args:
+        sample_mode (bool): If True, use generated sample data
+    
+    Returns:
+        tuple: (df_raw, df_clean) - all registrations with registerDate
+            parsed, and the cleaned deduplicated frame
+    """
+    df_raw = load_data(sample_mode=sample_mode)
+    df_raw['registerDate'] = pd.to_datetime(df_raw['registerDate'], errors='coerce')
+    
+    df_clean = clean_event_data(df_raw, verbose=False)
+    return df_raw, df_clean
+
 def create_sample_data(num_rows=500):
     """
     Create realistic sample data for testing
@@ -75,31 +322,30 @@ def create_sample_data(num_rows=500):
         "Run for the Ocean by KUFA #3"
     ]
     
-    # Generate dates from Jan-Mar 2024
-    start_date = datetime(2024, 1, 1)
-    dates = [start_date + timedelta(days=np.random.randint(0, 90)) for _ in range(num_rows)]
+    # Generate dates from Jan-Mar 2024 as datetime64 arrays
+    dates = np.datetime64('2024-01-01') + np.random.randint(0, 90, num_rows).astype('timedelta64[D]')
     
-    # Generate birth dates (ages 18-70)
-    birth_dates = [datetime(2024 - np.random.randint(18, 70), 
-                           np.random.randint(1, 13), 
-                           np.random.randint(1, 28)) for _ in range(num_rows)]
+    # Generate birth dates (ages 18-70) from year, month and day offsets
+    birth_years = (2024 - np.random.randint(18, 70, num_rows) - 1970).astype('datetime64[Y]')
+    birth_months = birth_years + np.random.randint(0, 12, num_rows).astype('timedelta64[M]')
+    birth_dates = birth_months.astype('datetime64[D]') + np.random.randint(0, 27, num_rows).astype('timedelta64[D]')
     
     data = {
-        'ID': [f'ID_{i:06d}' for i in range(num_rows)],
-        'registrationId': [f'REG_{np.random.randint(10000, 99999)}' for _ in range(num_rows)],
+        'ID': np.char.add('ID_', np.char.zfill(np.arange(num_rows).astype(str), 6)),
+        'registrationId': np.char.add('REG_', np.random.randint(10000, 99999, num_rows).astype(str)),
         'gender': np.random.choice(['male', 'female'], num_rows, p=[0.55, 0.45]),
-        'birthDate': [bd.strftime('%Y-%m-%d') for bd in birth_dates],
+        'birthDate': np.datetime_as_string(birth_dates, unit='D'),
         'eventName': np.random.choice(thai_events, num_rows),
         'isVirtual': np.random.choice([True, False], num_rows, p=[0.15, 0.85]),
         'ticketTypeName': np.random.choice(['Early Bird', 'Regular', 'VIP', 'Student', 'Mini Marathon', 'Super Half Marathon'], num_rows),
         'ticketTypePrice': np.random.choice([400, 500, 600, 700, 800, 1000, 1200, 1500, 2000], num_rows, p=[0.1, 0.2, 0.15, 0.15, 0.1, 0.1, 0.1, 0.05, 0.05]),
         'province': np.random.choice(['Bangkok', 'Phuket', 'Chiang Mai', 'Khon Kaen', 'Surat Thani', 'Chonburi', 'Nonthaburi'], num_rows, p=[0.6, 0.1, 0.1, 0.05, 0.05, 0.05, 0.05]),
-        'registerDate': [d.strftime('%Y/%m/%d') for d in dates],
+        'registerDate': np.char.replace(np.datetime_as_string(dates, unit='D'), '-', '/'),
         'shirtType': np.random.choice(['Short Sleeves', 'Sleeveless', 'Tech Tee', 'Short Sleeves (Black)', 'Adult\'s short sleeve shirt'], num_rows),
         'shirtSize': np.random.choice(['S : chest 36"', 'M : chest 38"', 'L : chest 40"', 'XL : chest 42"', '2XL : chest 44"', '3XL : chest 46"'], num_rows),
         'country': ['Thailand'] * num_rows,
         'city': np.random.choice(['Bangkok', 'Phuket City', 'Chiang Mai', 'Hat Yai', 'Pattaya', 'Khon Kaen'], num_rows),
-        'postalCode': [str(np.random.randint(10000, 11000)) for _ in range(num_rows)]
+        'postalCode': np.random.randint(10000, 11000, num_rows).astype(str)
     }
     
     df = pd.DataFrame(data)
@@ -140,25 +386,24 @@ def get_data_summary(df):
     Returns:
         dict: Summary statistics
     """
+    # Null counts computed once and reused for the percentages
+    missing = df.isnull().sum()
+    missing_pct = missing / len(df) * 100
+    
     summary = {
         'shape': df.shape,
         'columns': list(df.columns),
-        'data_types': {col: str(dtype) for col, dtype in df.dtypes.items()},
-        'missing_values': df.isnull().sum().to_dict(),
-        'missing_percentage': {col: f"{(df[col].isnull().sum() / len(df)) * 100:.1f}%" for col in df.columns},
-        'unique_counts': {col: df[col].nunique() for col in df.columns},
+        'data_types': df.dtypes.astype(str).to_dict(),
+        'missing_values': missing.to_dict(),
+        'missing_percentage': {col: f"{pct:.1f}%" for col, pct in missing_pct.items()},
+        'unique_counts': df.nunique().to_dict(),
         'numeric_stats': {}
     }
     
-    # Add numeric column statistics
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    for col in numeric_cols:
-        summary['numeric_stats'][col] = {
-            'min': float(df[col].min()),
-            'max': float(df[col].max()),
-            'mean': float(df[col].mean()),
-            'median': float(df[col].median()),
-            'std': float(df[col].std())
-        }
+    # Add numeric column statistics in one aggregation over the numeric block
+    numeric = df.select_dtypes(include=[np.number])
+    if len(numeric.columns) > 0:
+        stats = numeric.agg(['min', 'max', 'mean', 'median', 'std']).astype(float)
+        summary['numeric_stats'] = stats.to_dict()
     
     return summary
\ No newline at end of file
@@ -4,67 +4,52 @@ import numpy as np
 from datetime import datetime, timedelta
 import re
 
-def extract_distance(ticket_name):
-    """
-    Extract distance value from ticketTypeName.
-    Formats to look for: 3K, 5K, 10K, 21.1K, 24K, 42.2K, etc.
-    Returns distance in format like '3K', '5K', '10K', '21.1K', '24K', '42.2K' or 'Other'
-    """
-    if pd.isna(ticket_name):
-        return 'Other'
-    
-    ticket_str = str(ticket_name).upper()
-    
-    # Pattern to find distances: numbers followed by K or KM
-    patterns = [
-        r'(\d+\.?\d*)\s*(K|KM)',  # 3K, 5K, 10K, 21.1K, 24K, 42.2K, 5KM, 10KM, etc.
-        r'(\d+)\s*(K|KM)',        # 3 K, 5 K, 10 K (with space)
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, ticket_str)
-        if match:
-            distance_num = match.group(1)
-            # Convert to float and back to string to remove trailing .0
-            try:
-                distance_float = float(distance_num)
-                if distance_float.is_integer():
-                    distance_str = str(int(distance_float))
-                else:
-                    distance_str = str(distance_float)
-                return f"{distance_str}K"
-            except:
-                return f"{distance_num}K"
-    
-    # If no distance pattern found, check for specific race types
-    if 'MARATHON' in ticket_str:
-        return '42.2K'
-    elif 'HALF' in ticket_str and 'MARATHON' in ticket_str:
-        return '21.1K'
-    elif 'HALF' in ticket_str:
-        return '21.1K'
-    elif 'FULL' in ticket_str and 'MARATHON' in ticket_str:
-        return '42.2K'
-    elif '24K' in ticket_str or '24 KM' in ticket_str:
-        return '24K'
-    elif '21K' in ticket_str or '21.1K' in ticket_str or 'HALF' in ticket_str:
-        return '21.1K'
-    elif '10K' in ticket_str:
-        return '10K'
-    elif '5K' in ticket_str:
-        return '5K'
-    elif '3K' in ticket_str:
-        return '3K'
-    
-    return 'Other'
+# Age bands in natural order; 'Unknown' sorts last
+AGE_GROUP_DTYPE = pd.CategoricalDtype(
+    ['<18', '18-24', '25-34', '35-44', '45-54', '55+', 'Unknown'],
+    ordered=True
+)
+
+# Price tier labels, cheapest first
+PRICE_TIER_LABELS = [
+    'Free', 'Budget (≤400฿)', 'Economy (401-600฿)', 'Standard (601-900฿)',
+    'Premium (901-1200฿)', 'VIP (>1200฿)'
+]
+
+# Monday-first weekday names, matching Series.dt.dayofweek codes 0-6
+WEEKDAY_DTYPE = pd.CategoricalDtype(
+    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+    ordered=True
+)
+
+# Fixed label sets, so these columns are stored as small integer codes
+GENDER_DTYPE = pd.CategoricalDtype(['Male', 'Female', 'LGBTQ'])
+EVENT_CATEGORY_DTYPE = pd.CategoricalDtype([
+    'สุขเต็มสิบ', 'Marathon', 'Half Marathon', 'Mini Marathon', '10K', '5K',
+    'Fun Run', 'Trail Run', 'Charity Run', 'Other'
+])
 
-def clean_event_data(df, verbose=True):
+# Distance in an upper-cased ticket name: a number followed by K or KM,
+# with or without a space - 3K, 10 K, 21.1K, 42.2K, 5KM, 10 KM, etc.
+DISTANCE_PATTERN = re.compile(r'(\d+\.?\d*)\s*K')
+
+# Race types for tickets without a number, checked in order - MARATHON
+# comes first, so a half marathon ticket without a distance maps to 42.2K.
+# Literal checks such as '10K' or '24 KM' are not needed here because
+# DISTANCE_PATTERN already matches them
+DISTANCE_KEYWORDS = (
+    ('MARATHON', '42.2K'),
+    ('HALF', '21.1K'),
+)
+
+def clean_event_data(df, verbose=True, debug=False):
     """
     Comprehensive data cleaning pipeline for event registration data
     
     Args:
         df (pd.DataFrame): Raw event registration data
         verbose (bool): Whether to print progress messages
+        debug (bool): With verbose, also compare the totals against the expected reference values
     
     Returns:
         pd.DataFrame: Cleaned and feature-engineered data with attributes
@@ -73,11 +58,10 @@ def clean_event_data(df, verbose=True):
         print("🧹 Starting data cleaning pipeline...")
         print(f"📊 Raw data shape: {df.shape}")
     
-    # Create a copy to avoid modifying original
-    df_clean = df.copy()
-    
-    # Store ORIGINAL data for metrics calculation
-    original_df = df.copy()
+    # Shallow copy: every step below replaces whole columns rather than
+    # writing into them, so the caller's frame is never modified and its
+    # column data does not need to be duplicated up front
+    df_clean = df.copy(deep=False)
     
     # ========== 0. CHECK RAW DATA FIRST ==========
     if verbose and 'eventName' in df_clean.columns:
@@ -87,29 +71,42 @@ def clean_event_data(df, verbose=True):
         raw_event_count = df_clean['eventName'].nunique()
         print(f"   Raw unique events: {raw_event_count:,}")
         
-        # Check for สุขเต็มสิบ in raw data
+        # Check for สุขเต็มสิบ in raw data - one substring test over the
+        # event names; argmax gives the first (most popular) match
         event_counts = df_clean['eventName'].value_counts()
-        found_suks = False
-        for event, count in event_counts.head(20).items():
-            if 'สุขเต็มสิบ' in str(event):
-                print(f"   ✓ Found in raw data: '{event}' with {count:,} participants")
-                found_suks = True
-                break
+        is_suks = event_counts.index.astype(str).str.contains('สุขเต็มสิบ', regex=False)
+        position = is_suks.argmax() if is_suks.any() else None
         
-        if not found_suks:
+        if position is not None and position < 20:
+            print(f"   ✓ Found in raw data: '{event_counts.index[position]}' with {event_counts.iloc[position]:,} participants")
+        else:
             print(f"   ❌ 'สุขเต็มสิบ' NOT FOUND in top 20 raw events!")
-            # Search all events
-            for event, count in event_counts.items():
-                if 'สุขเต็มสิบ' in str(event):
-                    print(f"   Found later: '{event}' with {count:,} participants (position {list(event_counts.index).index(event)+1})")
-                    found_suks = True
-                    break
+            if position is not None:
+                print(f"   Found later: '{event_counts.index[position]}' with {event_counts.iloc[position]:,} participants (position {position+1})")
     
     # ========== 1. MINIMAL EVENT NAME CLEANING ==========
     if 'eventName' in df_clean.columns:
-        # Just basic cleaning - preserve original names
-        df_clean['eventName'] = df_clean['eventName'].astype(str).str.strip()
-        original_df['eventName'] = original_df['eventName'].astype(str).str.strip()
+        # Just basic cleaning - preserve original names. Only the distinct
+        # names are stripped and the column stays categorical, so every
+        # count on it below works on integer codes
+        events = df_clean['eventName'].astype('category')
+        names = events.cat.categories.astype(str).str.strip()
+        
+        # Missing names become the string 'nan', as astype(str) would give
+        # (code -1 picks the label appended at the end)
+        names = names.append(pd.Index(['nan']))
+        name_codes, stripped_names = pd.factorize(names)
+        row_codes = name_codes[events.cat.codes.to_numpy()]
+        
+        # Categories in order of first appearance, so value_counts breaks
+        # ties the same way it did on the plain string column
+        seen = pd.unique(row_codes)
+        recode = np.empty(len(stripped_names), dtype=np.intp)
+        recode[seen] = np.arange(len(seen))
+        df_clean['eventName'] = pd.Categorical.from_codes(
+            recode[row_codes],
+            categories=stripped_names[seen]
+        )
         
         if verbose:
             print(f"\n📊 After basic cleaning:")
@@ -120,66 +117,40 @@ def clean_event_data(df, verbose=True):
             for i, (event, count) in enumerate(event_counts.items(), 1):
                 print(f"   {i:2}. '{event[:50]}': {count:,}")
     
-    # ========== 2. PROCESS DATES ==========
-    if 'registerDate' in df_clean.columns:
-        df_clean['registerDate'] = pd.to_datetime(df_clean['registerDate'], errors='coerce')
-        
-        # Extract date features
-        df_clean['registration_year'] = df_clean['registerDate'].dt.year
-        df_clean['registration_month'] = df_clean['registerDate'].dt.month
-        df_clean['registration_day'] = df_clean['registerDate'].dt.day
-        df_clean['registration_weekday'] = df_clean['registerDate'].dt.day_name()
-        df_clean['registration_week'] = df_clean['registerDate'].dt.isocalendar().week
-    
-    # ========== 3. PROCESS PRICES ==========
+    # ========== 2. PROCESS PRICES ==========
     if 'ticketTypePrice' in df_clean.columns:
         # Convert to numeric
         df_clean['ticketTypePrice'] = pd.to_numeric(df_clean['ticketTypePrice'], errors='coerce')
-        original_df['ticketTypePrice'] = pd.to_numeric(original_df['ticketTypePrice'], errors='coerce')
         
         # Fill missing
         df_clean['ticketTypePrice'] = df_clean['ticketTypePrice'].fillna(0)
-        original_df['ticketTypePrice'] = original_df['ticketTypePrice'].fillna(0)
-        
-        # Create price tiers
-        def categorize_price(price):
-            if pd.isna(price):
-                return 'Unknown'
-            elif price == 0:
-                return 'Free'
-            elif price <= 400:
-                return 'Budget (≤400฿)'
-            elif price <= 600:
-                return 'Economy (401-600฿)'
-            elif price <= 900:
-                return 'Standard (601-900฿)'
-            elif price <= 1200:
-                return 'Premium (901-1200฿)'
-            else:
-                return 'VIP (>1200฿)'
-        
-        df_clean['price_tier'] = df_clean['ticketTypePrice'].apply(categorize_price)
     
-    # ========== 4. CALCULATE METRICS FROM ORIGINAL DATA ==========
-    # Calculate from ORIGINAL data (before any filtering/cleaning)
-    total_registrations = len(original_df)
+    # ========== 3. CALCULATE METRICS FROM ALL DATA ==========
+    # df_clean still holds every registration here - rows are only
+    # dropped by the deduplication in section 4 - so the totals below
+    # cover ALL data without keeping a second copy of the frame
+    total_registrations = len(df_clean)
     
-    if 'ID' in original_df.columns:
-        unique_participants = original_df['ID'].nunique()
+    if 'ID' in df_clean.columns:
+        # Integer code per participant (-1 for a missing ID), reused for
+        # the deduplication in section 4
+        id_codes, id_uniques = pd.factorize(df_clean['ID'])
+        unique_participants = len(id_uniques)
     else:
         unique_participants = total_registrations
     
-    if 'ticketTypePrice' in original_df.columns:
-        total_revenue = original_df['ticketTypePrice'].sum()
+    if 'ticketTypePrice' in df_clean.columns:
+        total_revenue = df_clean['ticketTypePrice'].sum()
         avg_price_per_registration = total_revenue / total_registrations if total_registrations > 0 else 0
     else:
         total_revenue = 0
         avg_price_per_registration = 0
     
-    if 'eventName' in original_df.columns:
-        unique_events_all = original_df['eventName'].nunique()
+    if 'eventName' in df_clean.columns:
+        # Section 1 keeps only names that occur, so each category is one event
+        unique_events_all = len(df_clean['eventName'].cat.categories)
         # Get top events from ALL data
-        top_events_all = original_df['eventName'].value_counts().head(10)
+        top_events_all = df_clean['eventName'].value_counts().head(10)
     else:
         unique_events_all = 0
         top_events_all = pd.Series()
@@ -198,38 +169,79 @@ def clean_event_data(df, verbose=True):
             if 'สุขเต็มสิบ' in str(event):
                 print(f"        ⭐ THIS SHOULD BE TOP EVENT")
     
-    # ========== 5. PROCESS AGE ==========
+    # ========== 4. REMOVE DUPLICATES FOR DEMOGRAPHIC ANALYSIS ==========
+    # Done before the per-row features below so they only run once per
+    # participant; everything that needs ALL rows is already computed
+    if 'ID' in df_clean.columns:
+        if verbose:
+            print(f"\n✨ Creating deduplicated dataset for demographics...")
+        
+        rows_before = len(df_clean)
+        # First row of each ID code, in the original row order - same rows
+        # as drop_duplicates(subset=['ID']) without re-hashing the IDs
+        first_rows = np.unique(id_codes, return_index=True)[1]
+        df_clean = df_clean.iloc[np.sort(first_rows)]
+        duplicates_removed = rows_before - len(df_clean)
+        
+        if verbose:
+            print(f"   Removed {duplicates_removed:,} duplicate participant records")
+            print(f"   Kept {len(df_clean):,} unique participants for analysis")
+    
+    # ========== 5. PROCESS DATES ==========
+    if 'registerDate' in df_clean.columns:
+        df_clean['registerDate'] = pd.to_datetime(df_clean['registerDate'], errors='coerce')
+        
+        # Extract date features
+        register_dt = df_clean['registerDate'].dt
+        df_clean['registration_year'] = register_dt.year
+        df_clean['registration_month'] = register_dt.month
+        df_clean['registration_day'] = register_dt.day
+        
+        # Weekday names from the day-of-week codes instead of one string
+        # per row; NaT dates get code -1 (missing)
+        weekday_codes = register_dt.dayofweek.to_numpy(dtype=np.int8, na_value=-1)
+        df_clean['registration_weekday'] = pd.Categorical.from_codes(weekday_codes, dtype=WEEKDAY_DTYPE)
+        df_clean['registration_week'] = register_dt.isocalendar().week
+    
+    # ========== 6. PRICE TIERS ==========
+    if 'ticketTypePrice' in df_clean.columns:
+        # Create price tiers in one vectorised pass; zero is 'Free' and
+        # anything else up to 400 (including odd negatives) is 'Budget'
+        price = df_clean['ticketTypePrice']
+        price_tiers = pd.cut(
+            price,
+            bins=[-np.inf, 400, 600, 900, 1200, np.inf],
+            labels=PRICE_TIER_LABELS[1:]
+        )
+        df_clean['price_tier'] = price_tiers.cat.set_categories(PRICE_TIER_LABELS).mask(price == 0, 'Free')
+    
+    # ========== 7. PROCESS AGE ==========
     if 'birthDate' in df_clean.columns:
         df_clean['birthDate'] = pd.to_datetime(df_clean['birthDate'], errors='coerce')
         
+        # Completed years from the calendar fields: year difference, minus
+        # one where this year's birthday is still ahead
         today = pd.Timestamp.now()
-        df_clean['age'] = ((today - df_clean['birthDate']).dt.days / 365.25)
+        birth = df_clean['birthDate'].dt
+        birthday_ahead = (birth.month * 100 + birth.day) > (today.month * 100 + today.day)
+        age = today.year - birth.year - birthday_ahead
         
-        # Convert to integer
-        df_clean['age'] = df_clean['age'].apply(
-            lambda x: int(x) if pd.notna(x) and 0 <= x <= 120 else np.nan
-        )
+        # Blank anything outside 0-120; nullable Int16 keeps the missing
+        # ages without falling back to float64
+        age = age.where((age >= 0) & (age <= 120))
+        df_clean['age'] = age.astype('Int16')
         
-        # Age groups
-        def get_age_group(age):
-            if pd.isna(age):
-                return 'Unknown'
-            if age < 18:
-                return '<18'
-            elif age < 25:
-                return '18-24'
-            elif age < 35:
-                return '25-34'
-            elif age < 45:
-                return '35-44'
-            elif age < 55:
-                return '45-54'
-            else:
-                return '55+'
-        
-        df_clean['age_group'] = df_clean['age'].apply(get_age_group)
+        # Age groups - right=False keeps the old "age < 18" style edges;
+        # NaN ages fall outside every bin and become 'Unknown'
+        age_groups = pd.cut(
+            df_clean['age'],
+            bins=[-np.inf, 18, 25, 35, 45, 55, np.inf],
+            labels=AGE_GROUP_DTYPE.categories[:-1],
+            right=False
+        )
+        df_clean['age_group'] = age_groups.astype(AGE_GROUP_DTYPE).fillna('Unknown')
     
-    # ========== 6. PROCESS GENDER ==========
+    # ========== 8. PROCESS GENDER ==========
     if 'gender' in df_clean.columns:
         df_clean['gender'] = df_clean['gender'].astype(str).str.lower().str.strip()
         
@@ -253,40 +265,69 @@ def clean_event_data(df, verbose=True):
             'trans': 'LGBTQ'
         }
         
-        df_clean['gender'] = df_clean['gender'].map(gender_mapping).fillna('LGBTQ')
+        df_clean['gender'] = df_clean['gender'].map(gender_mapping).fillna('LGBTQ').astype(GENDER_DTYPE)
     
-    # ========== 7. EXTRACT EVENT CATEGORY ==========
+    # ========== 9. EXTRACT EVENT CATEGORY ==========
     if 'eventName' in df_clean.columns:
-        def extract_event_category(event_name):
-            name_lower = str(event_name).lower()
-            
-            if 'สุขเต็มสิบ' in name_lower:
-                return 'สุขเต็มสิบ'
-            elif 'marathon' in name_lower and 'half' not in name_lower and 'mini' not in name_lower:
-                return 'Marathon'
-            elif 'half' in name_lower:
-                return 'Half Marathon'
-            elif 'mini' in name_lower:
-                return 'Mini Marathon'
-            elif '10k' in name_lower or '10 km' in name_lower:
-                return '10K'
-            elif '5k' in name_lower or '5 km' in name_lower:
-                return '5K'
-            elif 'fun run' in name_lower:
-                return 'Fun Run'
-            elif 'trail' in name_lower:
-                return 'Trail Run'
-            elif 'charity' in name_lower:
-                return 'Charity Run'
-            else:
-                return 'Other'
+        # eventName is categorical since section 1: lower-case and classify
+        # each distinct name once, then spread the result over the rows
+        events = df_clean['eventName']
+        name_lower = events.cat.categories.astype(str).str.lower()
+        
+        def contains(*words):
+            """Names whose lower-cased text contains any of the words"""
+            mask = name_lower.str.contains(words[0], regex=False)
+            for word in words[1:]:
+                mask |= name_lower.str.contains(word, regex=False)
+            return mask
+        
+        is_half = contains('half')
+        is_mini = contains('mini')
         
-        df_clean['event_category'] = df_clean['eventName'].apply(extract_event_category)
+        # First matching rule wins, as in an if/elif chain
+        event_category = np.select(
+            [
+                contains('สุขเต็มสิบ'),
+                contains('marathon') & ~is_half & ~is_mini,
+                is_half,
+                is_mini,
+                contains('10k', '10 km'),
+                contains('5k', '5 km'),
+                contains('fun run'),
+                contains('trail'),
+                contains('charity')
+            ],
+            ['สุขเต็มสิบ', 'Marathon', 'Half Marathon', 'Mini Marathon', '10K', '5K',
+             'Fun Run', 'Trail Run', 'Charity Run'],
+            default='Other'
+        )
+        category_codes = EVENT_CATEGORY_DTYPE.categories.get_indexer(event_category)
+        df_clean['event_category'] = pd.Categorical.from_codes(
+            category_codes[events.cat.codes.to_numpy()],
+            dtype=EVENT_CATEGORY_DTYPE
+        )
     
-    # ========== 8. EXTRACT DISTANCE CATEGORY ==========
+    # ========== 10. EXTRACT DISTANCE CATEGORY ==========
     if 'ticketTypeName' in df_clean.columns:
-        # Apply distance extraction function
-        df_clean['distance_category'] = df_clean['ticketTypeName'].apply(extract_distance)
+        # DISTANCE_PATTERN first, then the DISTANCE_KEYWORDS fallbacks,
+        # applied to the whole column at once
+        ticket_names = df_clean['ticketTypeName'].astype(str).str.upper()
+        
+        # First number followed by K/KM, e.g. 21.1K, 10 KM
+        # float even when every match is whole, so str() always gives '10.0'
+        distance_num = pd.to_numeric(ticket_names.str.extract(DISTANCE_PATTERN, expand=False)).astype(float)
+        distance_str = distance_num.astype(str)
+        distance_str = distance_str.mask(distance_num % 1 == 0, distance_str.str[:-2])  # drop trailing .0
+        
+        # No number: fall back on the race type named in the ticket
+        df_clean['distance_category'] = np.select(
+            [distance_num.notna()] + [
+                ticket_names.str.contains(keyword, regex=False)
+                for keyword, _ in DISTANCE_KEYWORDS
+            ],
+            [distance_str + 'K'] + [distance for _, distance in DISTANCE_KEYWORDS],
+            default='Other'
+        )
         
         # Define the desired order for distances
         distance_order = ['5K', '10K', '21.1K', '42.2K', 'Other']
@@ -304,21 +345,13 @@ def clean_event_data(df, verbose=True):
             for distance, count in distance_counts.items():
                 print(f"   {distance}: {count:,} participants")
     
-    # ========== 9. REMOVE DUPLICATES FOR DEMOGRAPHIC ANALYSIS ==========
-    if verbose:
-        print(f"\n✨ Creating deduplicated dataset for demographics...")
-    
-    rows_before = len(df_clean)
-    
-    if 'ID' in df_clean.columns:
-        df_clean = df_clean.drop_duplicates(subset=['ID'])
-        duplicates_removed = rows_before - len(df_clean)
-        
+    # ========== 11. FALLBACK DEDUPLICATION ==========
+    # Without an ID, duplicates are matched on the cleaned gender and
+    # dates, so this has to wait until those columns are processed
+    if 'ID' not in df_clean.columns:
         if verbose:
-            print(f"   Removed {duplicates_removed:,} duplicate participant records")
-            print(f"   Kept {len(df_clean):,} unique participants for analysis")
-    else:
-        # Fallback deduplication
+            print(f"\n✨ Creating deduplicated dataset for demographics...")
+        
         key_fields = ['eventName', 'registerDate']
         if 'gender' in df_clean.columns:
             key_fields.append('gender')
@@ -330,7 +363,16 @@ def clean_event_data(df, verbose=True):
     # Reset index
     df_clean = df_clean.reset_index(drop=True)
     
-    # ========== 10. STORE ALL METRICS AS ATTRIBUTES ==========
+    # ========== 12. CONVERT LOW-CARDINALITY COLUMNS TO CATEGORY ==========
+    # Integer codes make value_counts/groupby cheaper and shrink memory;
+    # groupbys on these columns should pass observed=True. gender,
+    # event_category, price_tier and age_group already have fixed
+    # categories, which may include labels with no rows
+    if 'eventName' in df_clean.columns:
+        # Already categorical since section 1; drop names left with no rows
+        df_clean['eventName'] = df_clean['eventName'].cat.remove_unused_categories()
+    
+    # ========== 13. STORE ALL METRICS AS ATTRIBUTES ==========
     # Store the important metrics as dataframe attributes
     df_clean.attrs['total_registrations'] = total_registrations
     df_clean.attrs['unique_participants'] = unique_participants
@@ -344,54 +386,55 @@ def clean_event_data(df, verbose=True):
         df_clean.attrs['top_event_name'] = top_events_all.index[0]
         df_clean.attrs['top_event_count'] = int(top_events_all.iloc[0])
     
-    # ========== 11. FINAL VERIFICATION ==========
+    # ========== 14. FINAL VERIFICATION ==========
     if verbose:
         print("\n" + "="*60)
         print("✅ DATA PROCESSING COMPLETE")
         print("="*60)
         
-        # Expected values
-        expected = {
-            'registrations': 212522,
-            'participants': 133908,
-            'revenue': 150466762.99,
-            'avg_price': 708,
-            'events': 528,
-            'top_event_count': 6135,
-        }
-        
-        print(f"\n📊 FINAL METRICS (from ALL data):")
-        print(f"   Total Registrations: {total_registrations:,} (expected: {expected['registrations']:,})")
-        print(f"   Unique Participants: {unique_participants:,} (expected: {expected['participants']:,})")
-        print(f"   Unique Events:       {unique_events_all:,} (expected: {expected['events']:,})")
-        print(f"   Total Revenue:       ฿{total_revenue:,.2f} (expected: ฿{expected['revenue']:,.2f})")
-        print(f"   Avg Price:           ฿{avg_price_per_registration:,.2f} (expected: ฿{expected['avg_price']:,.2f})")
-        
-        # Check differences
-        diffs = {
-            'registrations': total_registrations - expected['registrations'],
-            'participants': unique_participants - expected['participants'],
-            'events': unique_events_all - expected['events'],
-            'revenue': total_revenue - expected['revenue'],
-            'avg_price': avg_price_per_registration - expected['avg_price'],
-        }
-        
-        print(f"\n🔍 DIFFERENCES:")
-        for key, diff in diffs.items():
-            if abs(diff) > {
-                'registrations': 100,
-                'participants': 100,
-                'events': 10,
-                'revenue': 1000,
-                'avg_price': 10
-            }.get(key, 0):
-                print(f"   ⚠️  {key}: {diff:+,}")
-        
+        if debug:
+            # Expected values
+            expected = {
+                'registrations': 212522,
+                'participants': 133908,
+                'revenue': 150466762.99,
+                'avg_price': 708,
+                'events': 528,
+                'top_event_count': 6135,
+            }
+            
+            print(f"\n📊 FINAL METRICS (from ALL data):")
+            print(f"   Total Registrations: {total_registrations:,} (expected: {expected['registrations']:,})")
+            print(f"   Unique Participants: {unique_participants:,} (expected: {expected['participants']:,})")
+            print(f"   Unique Events:       {unique_events_all:,} (expected: {expected['events']:,})")
+            print(f"   Total Revenue:       ฿{total_revenue:,.2f} (expected: ฿{expected['revenue']:,.2f})")
+            print(f"   Avg Price:           ฿{avg_price_per_registration:,.2f} (expected: ฿{expected['avg_price']:,.2f})")
+            
+            # Check differences
+            diffs = {
+                'registrations': total_registrations - expected['registrations'],
+                'participants': unique_participants - expected['participants'],
+                'events': unique_events_all - expected['events'],
+                'revenue': total_revenue - expected['revenue'],
+                'avg_price': avg_price_per_registration - expected['avg_price'],
+            }
+            
+            print(f"\n🔍 DIFFERENCES:")
+            for key, diff in diffs.items():
+                if abs(diff) > {
+                    'registrations': 100,
+                    'participants': 100,
+                    'events': 10,
+                    'revenue': 1000,
+                    'avg_price': 10
+                }.get(key, 0):
+                    print(f"   ⚠️  {key}: {diff:+,}")
+            
         print("="*60)
     
     return df_clean
 
-def calculate_kpis(df):
+def calculate_kpis(df, debug=False):
     """
     Calculate Key Performance Indicators
     
@@ -399,6 +442,7 @@ def calculate_kpis(df):
     
     Args:
         df (pd.DataFrame): Cleaned event data with attributes
+        debug (bool): Whether to print the KPIs and check them against the expected reference values
     
     Returns:
         dict: Dictionary of KPI metrics
@@ -449,10 +493,12 @@ def calculate_kpis(df):
     
     # Age metrics from deduplicated data
     if 'age' in df.columns:
+        # float64 so an all-missing column gives NaN rather than pd.NA
+        age_stats = df['age'].astype('float64').agg(['mean', 'median', 'count'])
         kpis.update({
-            'avg_age': float(df['age'].mean()),
-            'median_age': float(df['age'].median()),
-            'participants_with_age': int(df['age'].notna().sum()),
+            'avg_age': float(age_stats['mean']),
+            'median_age': float(age_stats['median']),
+            'participants_with_age': int(age_stats['count']),
         })
     
     # Event category from deduplicated data
@@ -467,9 +513,10 @@ def calculate_kpis(df):
     
     # Date metrics from deduplicated data
     if 'registerDate' in df.columns:
+        date_stats = df['registerDate'].agg(['min', 'max'])
         kpis.update({
-            'earliest_registration': df['registerDate'].min().strftime('%Y-%m-%d'),
-            'latest_registration': df['registerDate'].max().strftime('%Y-%m-%d'),
+            'earliest_registration': date_stats['min'].strftime('%Y-%m-%d'),
+            'latest_registration': date_stats['max'].strftime('%Y-%m-%d'),
         })
     
     # ========== 4. CALCULATE PERCENTAGES ==========
@@ -483,6 +530,10 @@ def calculate_kpis(df):
         if 'participants_with_age' in kpis:
             kpis['age_known_percentage'] = (kpis['participants_with_age'] / kpis['total_participants'] * 100)
     
+    # Everything below is console diagnostics only
+    if not debug:
+        return kpis
+    
     # ========== 5. DEBUG OUTPUT ==========
     print(f"\n🔍 KPI CALCULATION DEBUG:")
     print(f"   Total Participants (unique): {kpis['total_participants']:,}")
@@ -564,11 +615,12 @@ def get_top_categories(df, column, n=10):
     if column == 'eventName' and hasattr(df, 'attrs') and 'top_events_all' in df.attrs:
         # Get top events from ALL data (212,522 registrations)
         top_events_dict = df.attrs['top_events_all']
-        top_df = pd.DataFrame(list(top_events_dict.items()), columns=['eventName', 'count'])
+        top_df = pd.Series(top_events_dict, name='count').rename_axis('eventName').reset_index()
         return top_df.head(n)
     
     # For other columns, use current (deduplicated) data
-    result = df[column].value_counts().head(n).reset_index()
+    counts = df[column].value_counts()
+    result = counts[counts > 0].head(n).reset_index()  # skip unused categories
     result.columns = [column, 'count']
     
     return result
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""test_preprocessing.py - Checks for the cleaning pipeline
+
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from preprocessing import clean_event_data
+
+
+def distance_categories(ticket_names):
+    """Run the pipeline on bare ticket names and return distance_category"""
+    df = pd.DataFrame({'ID': range(len(ticket_names)), 'ticketTypeName': ticket_names})
+    distance = clean_event_data(df, verbose=False)['distance_category']
+    return distance.astype(object).where(distance.notna(), None).tolist()
+
+
+class DistanceCategoryTest(unittest.TestCase):
+    def test_all_whole_number_distances(self):
+        # Every ticket matches, so the extracted numbers parse as integers;
+        # 42K is not one of the ordered categories and comes back missing
+        self.assertEqual(
+            distance_categories(['10K', '5K', '42K', '5 KM']),
+            ['10K', '5K', None, '5K']
+        )
+
+    def test_mixed_distances(self):
+        self.assertEqual(
+            distance_categories(['21.1K', '10K', '42.2 km', '5.0K', 'Half', 'Marathon', 'Regular']),
+            ['21.1K', '10K', '42.2K', '5K', '21.1K', '42.2K', 'Other']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()